@@ -11,8 +11,9 @@ from backend.database import get_db
 from backend.models import User as UserModel
 from backend.schemas import TokenData, User
 
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Password hashing: new hashes use argon2id; bcrypt hashes still verify and
+# are rehashed on login.
+pwd_context = CryptContext(schemes=["argon2", "bcrypt"], deprecated="auto")
 
 # OAuth2 scheme
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/auth/login")
@@ -29,12 +30,20 @@ def get_password_hash(password: str) -> str:
 
 
 def authenticate_user(db: Session, email: str, password: str) -> Optional[UserModel]:
-    """Authenticate a user by email and password."""
+    """Authenticate a user by email and password.
+
+    A valid password stored under a deprecated scheme (bcrypt) is rehashed
+    with argon2id and saved, so existing users migrate on their next login.
+    """
     user = db.query(UserModel).filter(UserModel.email == email).first()
     if not user:
         return None
-    if not verify_password(password, user.hashed_password):
+    verified, new_hash = pwd_context.verify_and_update(password, user.hashed_password)
+    if not verified:
         return None
+    if new_hash:
+        user.hashed_password = new_hash
+        db.commit()
     return user
 
 
@@ -1,19 +1,49 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy import create_engine, make_url
+from sqlalchemy.orm import DeclarativeBase, sessionmaker
+from sqlalchemy.pool import NullPool
 from backend.config import settings
 
-# Create database engine
-engine = create_engine(
-    settings.database_url,
-    pool_pre_ping=True,
-    echo=settings.debug
-)
+# Create database engine.
+# One engine (and therefore one connection pool) is shared by the whole
+# process. Pool sizing should roughly match the expected concurrency per
+# worker. When a process manager forks workers after this module is
+# imported (e.g. gunicorn with preload_app), each child must call
+# engine.dispose() in its post_fork hook so it never reuses the parent's
+# sockets, or FORK_WORKERS=True can be set to disable pooling entirely.
+DB_URL = settings.database_url
+
+engine_options = {
+    "pool_pre_ping": True,
+    "echo": settings.sql_echo,
+    # Compiled SQL cache entries per engine (SQLAlchemy default is 500)
+    "query_cache_size": 1200,
+}
+if settings.fork_workers:
+    engine_options["poolclass"] = NullPool
+elif not DB_URL.startswith("sqlite"):
+    engine_options.update(
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout,
+        pool_recycle=settings.db_pool_recycle,
+    )
+
+# PgBouncer in transaction mode cannot track server-side prepared statements
+# across pooled backends. psycopg (v3) prepares repeated statements
+# automatically, so that is switched off; psycopg2 never prepares statements.
+if settings.behind_pgbouncer and make_url(DB_URL).get_driver_name() == "psycopg":
+    engine_options["connect_args"] = {"prepare_threshold": None}
+
+engine = create_engine(DB_URL, **engine_options)
+
+# Create SessionLocal class. Objects stay loaded after commit so handlers
+# that return them do not trigger a reload of every attribute.
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
 
-# Create SessionLocal class
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 # Create Base class for models
-Base = declarative_base()
+class Base(DeclarativeBase):
+    pass
 
 
 # Dependency for FastAPI
@@ -24,3 +54,11 @@ def get_db():
     finally:
         db.close()
 
+
+def get_session_factory() -> sessionmaker:
+    """Dependency for work that outlives the request's session.
+
+    Background tasks and streamed response bodies run after get_db has closed
+    its session, so they open their own from this factory.
+    """
+    return SessionLocal
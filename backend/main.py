@@ -1,84 +1,134 @@
-from fastapi import FastAPI
-from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
+from fastapi import FastAPI, HTTPException, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse, ORJSONResponse
+from urllib.parse import quote
+import importlib
+import orjson
 import os
+import stat
 
 from backend.config import settings
 from backend.database import engine, Base
-from backend.routers import (
-    auth,
-    users,
-    periods,
-    tasks,
-    files,
-    approvals,
-    comments,
-    dashboard,
-    reports,
-    trial_balance,
-    task_templates,
-    notifications,
-    search,
-)
+from backend import models  # noqa: F401  (registers tables on Base.metadata)
+from backend.middleware.compression import TextGZipMiddleware
+from backend.middleware.fast_cors import FastCORSMiddleware
+
+# Settings read at startup, bound once as module constants
+APP_NAME = settings.app_name
+APP_VERSION = settings.app_version
+DEBUG = settings.debug
+ORIGINS = settings.origins_frozenset
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
+# Router modules under backend.routers, in registration order
+ROUTER_NAMES = (
+    "auth",
+    "users",
+    "periods",
+    "tasks",
+    "files",
+    "approvals",
+    "comments",
+    "dashboard",
+    "reports",
+    "trial_balance",
+    "task_templates",
+    "notifications",
+    "search",
+)
 
 # Initialize FastAPI app
 app = FastAPI(
-    title=settings.app_name,
-    version=settings.app_version,
-    description="Self-hosted month-end close management application"
+    title=APP_NAME,
+    version=APP_VERSION,
+    description="Self-hosted month-end close management application",
+    default_response_class=ORJSONResponse,
 )
 
+
+@app.on_event("startup")
+async def init_database():
+    """Create database tables once the server starts rather than at import time."""
+    await run_in_threadpool(Base.metadata.create_all, bind=engine)
+
+
+# Compress larger JSON and text payloads; file downloads pass through as-is.
+# Middleware added later wraps earlier ones, so CORS (added below) stays
+# outermost and preflights are never compressed.
+app.add_middleware(TextGZipMiddleware, minimum_size=1024)
+
 # Configure CORS
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=settings.origins_list,
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+app.add_middleware(FastCORSMiddleware, origins=ORIGINS)
 
 # Include routers
-app.include_router(auth.router)
-app.include_router(users.router)
-app.include_router(periods.router)
-app.include_router(tasks.router)
-app.include_router(files.router)
-app.include_router(approvals.router)
-app.include_router(comments.router)
-app.include_router(dashboard.router)
-app.include_router(reports.router)
-app.include_router(trial_balance.router)
-app.include_router(task_templates.router)
-app.include_router(notifications.router)
-app.include_router(search.router)
-
-# Mount static files
-if os.path.exists(settings.file_storage_path):
-    app.mount("/files", StaticFiles(directory=settings.file_storage_path), name="files")
+for router_name in ROUTER_NAMES:
+    app.include_router(importlib.import_module(f"backend.routers.{router_name}").router)
+
+# Resolved once so every /files request only needs a realpath + stat
+FILES_ROOT = os.path.realpath(settings.file_storage_path)
+
+# Static payloads serialized once; probes hit these many times per second
+ROOT_BODY = orjson.dumps({
+    "name": APP_NAME,
+    "version": APP_VERSION,
+    "status": "operational",
+    "docs": "/docs",
+    "redoc": "/redoc"
+})
+HEALTH_BODY = b'{"status":"healthy"}'
 
 
 @app.get("/")
 async def root():
     """Root endpoint with API information."""
-    return {
-        "name": settings.app_name,
-        "version": settings.app_version,
-        "status": "operational",
-        "docs": "/docs",
-        "redoc": "/redoc"
-    }
+    return Response(content=ROOT_BODY, media_type="application/json")
 
 
 @app.get("/api/health")
 async def health_check():
     """Health check endpoint."""
-    return {"status": "healthy"}
+    return Response(content=HEALTH_BODY, media_type="application/json")
+
+
+@app.api_route("/files/{relative_path:path}", methods=["GET", "HEAD"], include_in_schema=False)
+async def serve_stored_file(relative_path: str):
+    """Serve a file from the storage directory.
+
+    When FILES_ACCEL_REDIRECT_PREFIX is configured the body is delegated to
+    the reverse proxy (nginx X-Accel-Redirect) so file bytes never pass
+    through Python; otherwise Starlette's FileResponse streams the file.
+    """
+    full_path = os.path.realpath(os.path.join(FILES_ROOT, relative_path))
+    if os.path.commonpath([FILES_ROOT, full_path]) != FILES_ROOT:
+        raise HTTPException(status_code=404, detail="Not Found")
+
+    try:
+        stat_result = os.stat(full_path)
+    except OSError:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not stat.S_ISREG(stat_result.st_mode):
+        raise HTTPException(status_code=404, detail="Not Found")
+
+    if settings.files_accel_redirect_prefix:
+        relative_url = quote(os.path.relpath(full_path, FILES_ROOT).replace(os.sep, "/"))
+        prefix = settings.files_accel_redirect_prefix.rstrip("/")
+        return Response(headers={"X-Accel-Redirect": f"{prefix}/{relative_url}"})
+
+    return FileResponse(full_path, stat_result=stat_result)
 
 
 if __name__ == "__main__":
+    import sys
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000, reload=settings.debug)
 
+    # uvloop is unavailable on Windows and the reloader runs a single worker,
+    # so development falls back to the stdlib asyncio loop.
+    use_uvloop = not DEBUG and sys.platform != "win32"
+    uvicorn.run(
+        "backend.main:app",
+        host="0.0.0.0",
+        port=8000,
+        reload=DEBUG,
+        workers=None if DEBUG else settings.workers,
+        loop="uvloop" if use_uvloop else "asyncio",
+        http="httptools",
+    )
@@ -0,0 +1,41 @@
+"""
+GZip compression limited to JSON and text responses.
+
+Starlette's GZipMiddleware compresses every response over the size threshold,
+including file downloads, zip archives and partial (206) responses. Those are
+either already compressed or must keep their Content-Length and byte offsets,
+so this variant passes any other content type through untouched.
+"""
+from starlette.datastructures import Headers
+from starlette.middleware.gzip import GZipMiddleware, GZipResponder
+from starlette.types import Message, Receive, Scope, Send
+
+
+COMPRESSIBLE_TYPES = ("application/json", "text/")
+
+
+class _TextGZipResponder(GZipResponder):
+    async def send_with_gzip(self, message: Message) -> None:
+        await super().send_with_gzip(message)
+        if message["type"] == "http.response.start" and not self.content_encoding_set:
+            headers = Headers(raw=message["headers"])
+            # Starlette forwards responses that already declare an encoding as-is
+            self.content_encoding_set = (
+                "content-range" in headers
+                or not headers.get("content-type", "").startswith(COMPRESSIBLE_TYPES)
+            )
+
+
+class TextGZipMiddleware(GZipMiddleware):
+    """GZipMiddleware that only compresses JSON and text/* responses."""
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http":
+            headers = Headers(scope=scope)
+            if "gzip" in headers.get("Accept-Encoding", ""):
+                responder = _TextGZipResponder(
+                    self.app, self.minimum_size, compresslevel=self.compresslevel
+                )
+                await responder(scope, receive, send)
+                return
+        await self.app(scope, receive, send)
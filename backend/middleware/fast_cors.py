@@ -0,0 +1,99 @@
+"""
+Minimal pure-ASGI CORS middleware for a static origin allow-list.
+
+The allow-list, preflight headers and credential headers are encoded to bytes
+once at startup so each request only performs a single header scan and a
+frozenset membership check.
+"""
+from typing import Iterable, List, Optional, Tuple
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+ALLOWED_METHODS = b"DELETE, GET, HEAD, OPTIONS, PATCH, POST, PUT"
+PREFLIGHT_MAX_AGE = b"600"
+
+
+class FastCORSMiddleware:
+    """CORS middleware that allows credentials, all methods and all headers
+    for an exact-match set of origins."""
+
+    def __init__(self, app: ASGIApp, origins: Iterable[str]) -> None:
+        self.app = app
+        self._allowed = frozenset(origin.encode("latin-1") for origin in origins)
+        self._preflight_headers: List[Tuple[bytes, bytes]] = [
+            (b"access-control-allow-methods", ALLOWED_METHODS),
+            (b"access-control-max-age", PREFLIGHT_MAX_AGE),
+            (b"access-control-allow-credentials", b"true"),
+            (b"vary", b"Origin"),
+        ]
+        self._simple_headers: List[Tuple[bytes, bytes]] = [
+            (b"access-control-allow-credentials", b"true"),
+            (b"vary", b"Origin"),
+        ]
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        origin: Optional[bytes] = None
+        request_method: Optional[bytes] = None
+        request_headers: Optional[bytes] = None
+        for name, value in scope["headers"]:
+            if name == b"origin":
+                origin = value
+            elif name == b"access-control-request-method":
+                request_method = value
+            elif name == b"access-control-request-headers":
+                request_headers = value
+
+        if origin is None:
+            await self.app(scope, receive, send)
+            return
+
+        allowed = origin in self._allowed
+
+        if scope["method"] == "OPTIONS" and request_method is not None:
+            await self._preflight(origin, allowed, request_headers, send)
+            return
+
+        if not allowed:
+            await self.app(scope, receive, send)
+            return
+
+        simple_headers = [(b"access-control-allow-origin", origin), *self._simple_headers]
+
+        async def send_with_cors(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", []), *simple_headers]
+            await send(message)
+
+        await self.app(scope, receive, send_with_cors)
+
+    async def _preflight(
+        self,
+        origin: bytes,
+        allowed: bool,
+        request_headers: Optional[bytes],
+        send: Send,
+    ) -> None:
+        if not allowed:
+            body = b"Disallowed CORS origin"
+            await send({
+                "type": "http.response.start",
+                "status": 400,
+                "headers": [
+                    (b"content-type", b"text/plain; charset=utf-8"),
+                    (b"content-length", str(len(body)).encode("latin-1")),
+                ],
+            })
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        headers = [(b"access-control-allow-origin", origin), *self._preflight_headers]
+        if request_headers:
+            headers.append((b"access-control-allow-headers", request_headers))
+
+        await send({"type": "http.response.start", "status": 204, "headers": headers})
+        await send({"type": "http.response.body", "body": b""})
@@ -0,0 +1,84 @@
+"""
+Migration script to add indexes backing hot query paths.
+
+New databases get these indexes from the model definitions via create_all;
+this script adds them to databases created before the indexes existed.
+Every statement is idempotent, so it is safe to re-run. On PostgreSQL the
+indexes are built CONCURRENTLY so the tables stay writable during the build.
+
+The script can run before or after migrate_partition_audit_logs.py.
+PostgreSQL cannot build an index CONCURRENTLY on a partitioned table, so once
+audit_logs is partitioned its indexes are created without CONCURRENTLY; they
+already exist by then, so IF NOT EXISTS makes those statements no-ops.
+
+Run this with: docker-compose exec backend python backend/migrations/migrate_add_performance_indexes.py
+"""
+import os
+import sys
+
+# Add the parent directory to the path so we can import from backend
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from sqlalchemy import text
+from backend.database import engine
+
+
+# (index name, table, column list)
+INDEXES = [
+    ("ix_comments_task_created", "comments", "task_id, created_at DESC"),
+    ("ix_comments_user_id", "comments", "user_id"),
+    ("ix_approvals_task_id", "approvals", "task_id"),
+    ("ix_approvals_reviewer_status", "approvals", "reviewer_id, status"),
+    ("ix_audit_logs_task_id", "audit_logs", "task_id"),
+    ("ix_audit_logs_user_id", "audit_logs", "user_id"),
+    ("ix_tasks_period_status", "tasks", "period_id, status"),
+    ("ix_tasks_status_due", "tasks", "status, due_date"),
+    ("ix_tasks_owner_status", "tasks", "owner_id, status"),
+    ("ix_tasks_assignee_status", "tasks", "assignee_id, status"),
+    ("ix_files_task_id", "files", "task_id"),
+    ("ix_task_dependencies_depends_on_id", "task_dependencies", "depends_on_id"),
+    ("ix_files_period_task_null", "files", "period_id, task_id"),
+    ("ix_files_uploaded_at", "files", "uploaded_at"),
+    ("ix_notifications_user_unread", "notifications", "user_id, is_read, created_at DESC"),
+    ("ix_periods_close_type_yr_mo", "periods", "close_type, year, month"),
+]
+
+
+def run_migration():
+    """Create any missing performance indexes."""
+    print("Starting migration: Add performance indexes")
+
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block, so each
+    # statement is committed on its own.
+    concurrently = "CONCURRENTLY " if engine.dialect.name == "postgresql" else ""
+
+    try:
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            partitioned = set()
+            if concurrently:
+                partitioned = set(conn.execute(text(
+                    "SELECT relname FROM pg_class WHERE relkind = 'p'"
+                )).scalars())
+
+            for name, table, columns in INDEXES:
+                mode = "" if table in partitioned else concurrently
+                conn.execute(text(
+                    f"CREATE INDEX {mode}IF NOT EXISTS {name} ON {table} ({columns})"
+                ))
+                print(f"  ✓ {name} on {table}({columns})")
+
+        print("\n" + "="*50)
+        print("Migration completed successfully!")
+        print("="*50)
+
+    except Exception as e:
+        print(f"\n✗ Migration failed: {str(e)}")
+        raise
+
+
+if __name__ == "__main__":
+    try:
+        run_migration()
+    except Exception as e:
+        print(f"✗ Migration failed: {e}")
+        sys.exit(1)
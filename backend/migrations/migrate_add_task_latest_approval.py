@@ -0,0 +1,79 @@
+"""
+Migration script to denormalize each task's latest approval onto the task.
+
+This script:
+1. Adds latest_approval_status and latest_approval_at columns to tasks
+2. Backfills them from each task's most recent approval
+3. Creates an index on latest_approval_status
+
+Run this with: docker-compose exec backend python backend/migrations/migrate_add_task_latest_approval.py
+"""
+import os
+import sys
+
+# Add the parent directory to the path so we can import from backend
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from sqlalchemy import text
+from backend.database import engine
+
+
+def run_migration():
+    """Execute the task latest-approval migration."""
+    print("Starting migration: Add latest approval columns to tasks")
+
+    try:
+        # All steps run in a single transaction: one commit instead of one per step.
+        with engine.begin() as conn:
+            # Step 1: Add columns (approvalstatus is the enum type created with
+            # the approvals table)
+            print("\nStep 1: Adding latest approval columns to tasks...")
+            conn.execute(text("""
+                ALTER TABLE tasks
+                ADD COLUMN IF NOT EXISTS latest_approval_status approvalstatus DEFAULT NULL,
+                ADD COLUMN IF NOT EXISTS latest_approval_at TIMESTAMP WITH TIME ZONE DEFAULT NULL
+            """))
+            print("  ✓ latest_approval_status, latest_approval_at added to tasks")
+
+            # Step 2: Backfill from the most recent approval activity per task
+            print("\nStep 2: Backfilling from existing approvals...")
+            result = conn.execute(text("""
+                UPDATE tasks
+                SET latest_approval_status = latest.status,
+                    latest_approval_at = latest.activity_at
+                FROM (
+                    SELECT DISTINCT ON (task_id)
+                        task_id,
+                        status,
+                        COALESCE(reviewed_at, requested_at) AS activity_at
+                    FROM approvals
+                    ORDER BY task_id, COALESCE(reviewed_at, requested_at) DESC, id DESC
+                ) AS latest
+                WHERE tasks.id = latest.task_id
+            """))
+            rows_updated = result.rowcount
+            print(f"  ✓ Updated {rows_updated} tasks")
+
+            # Step 3: Create index
+            print("\nStep 3: Creating index...")
+            conn.execute(text("""
+                CREATE INDEX IF NOT EXISTS ix_tasks_latest_approval_status
+                ON tasks(latest_approval_status)
+            """))
+            print("  ✓ Index on latest_approval_status created")
+
+        print("\n" + "="*50)
+        print("Migration completed successfully!")
+        print("="*50)
+
+    except Exception as e:
+        print(f"\n✗ Migration failed: {str(e)}")
+        raise
+
+
+if __name__ == "__main__":
+    try:
+        run_migration()
+    except Exception as e:
+        print(f"✗ Migration failed: {e}")
+        sys.exit(1)
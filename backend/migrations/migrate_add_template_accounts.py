@@ -0,0 +1,73 @@
+"""
+Migration script to add the task_template_accounts table.
+
+This script:
+1. Creates task_template_accounts (one row per template/account number)
+2. Backfills it from task_templates.default_account_numbers
+
+The JSON column stays in place and is still written by the application, which
+keeps both in sync; it can be dropped once nothing reads it.
+
+Run this with: docker-compose exec backend python backend/migrations/migrate_add_template_accounts.py
+"""
+import os
+import sys
+
+# Add the parent directory to the path so we can import from backend
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from sqlalchemy import text
+from backend.database import engine
+
+
+def run_migration():
+    """Execute the template accounts migration."""
+    print("Starting migration: Add task_template_accounts table")
+
+    try:
+        # All steps run in a single transaction: one commit instead of one per step.
+        with engine.begin() as conn:
+            # Step 1: Create table and index
+            print("\nStep 1: Creating task_template_accounts table...")
+            conn.execute(text("""
+                CREATE TABLE IF NOT EXISTS task_template_accounts (
+                    template_id INTEGER NOT NULL,
+                    account_number VARCHAR(100) NOT NULL,
+                    PRIMARY KEY (template_id, account_number),
+                    FOREIGN KEY (template_id) REFERENCES task_templates(id) ON DELETE CASCADE
+                )
+            """))
+            conn.execute(text("""
+                CREATE INDEX IF NOT EXISTS ix_task_template_accounts_account_number
+                ON task_template_accounts(account_number)
+            """))
+            print("  ✓ task_template_accounts table created")
+
+            # Step 2: Copy account numbers out of the JSON lists
+            print("\nStep 2: Backfilling from default_account_numbers...")
+            result = conn.execute(text("""
+                INSERT INTO task_template_accounts (template_id, account_number)
+                SELECT DISTINCT t.id, TRIM(numbers.value)
+                FROM task_templates t
+                CROSS JOIN LATERAL json_array_elements_text(t.default_account_numbers::json) AS numbers(value)
+                WHERE json_typeof(t.default_account_numbers::json) = 'array'
+                  AND TRIM(numbers.value) <> ''
+                ON CONFLICT DO NOTHING
+            """))
+            print(f"  ✓ Inserted {result.rowcount} template account rows")
+
+        print("\n" + "="*50)
+        print("Migration completed successfully!")
+        print("="*50)
+
+    except Exception as e:
+        print(f"\n✗ Migration failed: {str(e)}")
+        raise
+
+
+if __name__ == "__main__":
+    try:
+        run_migration()
+    except Exception as e:
+        print(f"✗ Migration failed: {e}")
+        sys.exit(1)
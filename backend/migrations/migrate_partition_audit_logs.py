@@ -0,0 +1,152 @@
+"""
+Migration script to range-partition audit_logs by month (PostgreSQL only).
+
+This script:
+1. Converts audit_logs into a table partitioned by RANGE (created_at), copying
+   existing rows into monthly partitions plus a DEFAULT partition
+2. Creates partitions for the upcoming months
+
+Once converted, re-running the script only adds the upcoming partitions, so it
+can be scheduled monthly. Old history can then be retired with
+DROP TABLE audit_logs_yYYYYmMM instead of a large DELETE.
+
+The primary key becomes (id, created_at) because PostgreSQL requires the
+partition key in every unique constraint; ids still come from the same
+sequence, so the ORM keeps mapping on id alone.
+
+Run this with: docker-compose exec backend python backend/migrations/migrate_partition_audit_logs.py
+"""
+import os
+import sys
+from datetime import date
+
+# Add the parent directory to the path so we can import from backend
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from sqlalchemy import text
+from backend.database import engine
+
+
+# How many months past the current one to pre-create partitions for
+MONTHS_AHEAD = 3
+
+COLUMNS = (
+    "id, task_id, user_id, action, entity_type, entity_id, "
+    "old_value, new_value, details, ip_address, user_agent, created_at"
+)
+
+
+def _add_months(month_start: date, months: int) -> date:
+    """Return the first day of the month `months` after `month_start`."""
+    index = month_start.year * 12 + month_start.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _create_partitions(conn, first_month: date, last_month: date) -> int:
+    """Create monthly partitions covering first_month..last_month inclusive."""
+    created = 0
+    month = first_month
+    while month <= last_month:
+        next_month = _add_months(month, 1)
+        name = f"audit_logs_y{month.year}m{month.month:02d}"
+        conn.execute(text(f"""
+            CREATE TABLE IF NOT EXISTS {name} PARTITION OF audit_logs
+            FOR VALUES FROM ('{month.isoformat()}') TO ('{next_month.isoformat()}')
+        """))
+        created += 1
+        month = next_month
+    return created
+
+
+def run_migration():
+    """Partition audit_logs and create upcoming monthly partitions."""
+    print("Starting migration: Partition audit_logs by month")
+
+    if engine.dialect.name != "postgresql":
+        print("  ⚠ Skipped: table partitioning requires PostgreSQL")
+        return
+
+    this_month = date.today().replace(day=1)
+    last_month = _add_months(this_month, MONTHS_AHEAD)
+
+    try:
+        # All steps run in a single transaction: one commit instead of one per step.
+        with engine.begin() as conn:
+            relkind = conn.execute(text(
+                "SELECT relkind FROM pg_class WHERE relname = 'audit_logs' AND relkind IN ('r', 'p')"
+            )).scalar()
+
+            if relkind == "p":
+                print("\naudit_logs is already partitioned")
+            else:
+                # Step 1: Move the existing table aside
+                print("\nStep 1: Renaming existing audit_logs table...")
+                conn.execute(text("ALTER TABLE audit_logs RENAME TO audit_logs_unpartitioned"))
+                # Free the primary key's index name for the new table
+                conn.execute(text("ALTER INDEX audit_logs_pkey RENAME TO audit_logs_unpartitioned_pkey"))
+                print("  ✓ audit_logs renamed to audit_logs_unpartitioned")
+
+                # Step 2: Create the partitioned parent
+                print("\nStep 2: Creating partitioned audit_logs table...")
+                conn.execute(text("""
+                    CREATE TABLE audit_logs (
+                        LIKE audit_logs_unpartitioned INCLUDING DEFAULTS
+                    ) PARTITION BY RANGE (created_at)
+                """))
+                conn.execute(text("""
+                    ALTER TABLE audit_logs
+                    ALTER COLUMN created_at SET NOT NULL,
+                    ADD PRIMARY KEY (id, created_at),
+                    ADD FOREIGN KEY (task_id) REFERENCES tasks(id) ON DELETE CASCADE,
+                    ADD FOREIGN KEY (user_id) REFERENCES users(id)
+                """))
+                conn.execute(text("CREATE TABLE audit_logs_default PARTITION OF audit_logs DEFAULT"))
+                print("  ✓ Partitioned audit_logs created with a DEFAULT partition")
+
+                # Step 3: Create partitions for the existing history
+                print("\nStep 3: Creating monthly partitions for existing rows...")
+                oldest = conn.execute(text(
+                    "SELECT date_trunc('month', MIN(created_at))::date FROM audit_logs_unpartitioned"
+                )).scalar()
+                created = _create_partitions(conn, min(oldest or this_month, this_month), this_month)
+                print(f"  ✓ {created} monthly partitions created")
+
+                # Step 4: Copy rows and hand the id sequence to the new table
+                print("\nStep 4: Copying existing rows...")
+                result = conn.execute(text(f"""
+                    INSERT INTO audit_logs ({COLUMNS})
+                    SELECT {COLUMNS.replace("created_at", "COALESCE(created_at, now())")}
+                    FROM audit_logs_unpartitioned
+                """))
+                print(f"  ✓ Copied {result.rowcount} rows")
+                conn.execute(text("ALTER SEQUENCE audit_logs_id_seq OWNED BY audit_logs.id"))
+                conn.execute(text("DROP TABLE audit_logs_unpartitioned"))
+                print("  ✓ Old table dropped")
+
+                # Step 5: Recreate indexes (created on every partition)
+                print("\nStep 5: Creating indexes...")
+                conn.execute(text("CREATE INDEX IF NOT EXISTS ix_audit_logs_id ON audit_logs (id)"))
+                conn.execute(text("CREATE INDEX IF NOT EXISTS ix_audit_logs_task_id ON audit_logs (task_id)"))
+                conn.execute(text("CREATE INDEX IF NOT EXISTS ix_audit_logs_user_id ON audit_logs (user_id)"))
+                print("  ✓ Indexes on id, task_id, user_id created")
+
+            # Upcoming months
+            print(f"\nCreating partitions for the next {MONTHS_AHEAD} months...")
+            _create_partitions(conn, _add_months(this_month, 1), last_month)
+            print(f"  ✓ Partitions exist through {last_month.strftime('%Y-%m')}")
+
+        print("\n" + "="*50)
+        print("Migration completed successfully!")
+        print("="*50)
+
+    except Exception as e:
+        print(f"\n✗ Migration failed: {str(e)}")
+        raise
+
+
+if __name__ == "__main__":
+    try:
+        run_migration()
+    except Exception as e:
+        print(f"✗ Migration failed: {e}")
+        sys.exit(1)
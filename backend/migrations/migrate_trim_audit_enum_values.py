@@ -0,0 +1,55 @@
+"""
+Migration script to store plain enum values in audit log old/new values.
+
+Status changes used to be logged as str(enum), e.g. "TaskStatus.IN_PROGRESS" or
+"ApprovalStatus.PENDING". They are now logged as the enum value
+("in_progress", "pending"); this script rewrites existing rows to match.
+Re-running it is a no-op.
+
+Run this with: docker-compose exec backend python backend/migrations/migrate_trim_audit_enum_values.py
+"""
+import os
+import sys
+
+# Add the parent directory to the path so we can import from backend
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from sqlalchemy import text
+from backend.database import engine
+
+
+ENUM_PREFIXES = ("TaskStatus.", "ApprovalStatus.")
+
+
+def run_migration():
+    """Rewrite "EnumName.MEMBER" audit values as the member's value."""
+    print("Starting migration: Trim enum names from audit log values")
+
+    try:
+        # All steps run in a single transaction: one commit instead of one per step.
+        with engine.begin() as conn:
+            for column in ("old_value", "new_value"):
+                for prefix in ENUM_PREFIXES:
+                    # Member values are the lowercased member names
+                    result = conn.execute(text(f"""
+                        UPDATE audit_logs
+                        SET {column} = LOWER(SUBSTR({column}, :start))
+                        WHERE {column} LIKE :pattern
+                    """), {"start": len(prefix) + 1, "pattern": f"{prefix}%"})
+                    print(f"  ✓ {column}: trimmed {result.rowcount} {prefix[:-1]} values")
+
+        print("\n" + "="*50)
+        print("Migration completed successfully!")
+        print("="*50)
+
+    except Exception as e:
+        print(f"\n✗ Migration failed: {str(e)}")
+        raise
+
+
+if __name__ == "__main__":
+    try:
+        run_migration()
+    except Exception as e:
+        print(f"✗ Migration failed: {e}")
+        sys.exit(1)
@@ -1,9 +1,9 @@
 from sqlalchemy import (
     Column, Integer, String, DateTime, ForeignKey, Text,
-    Boolean, Enum, Table, Float, Date, Numeric, JSON
+    Boolean, Enum, Table, Float, Date, Numeric, JSON, Index
 )
-from sqlalchemy.orm import relationship
-from sqlalchemy.sql import func
+from sqlalchemy.orm import relationship, validates
+from sqlalchemy.sql import func, null, text
 from datetime import datetime
 import os
 import enum
@@ -51,7 +51,8 @@ task_dependencies = Table(
     'task_dependencies',
     Base.metadata,
     Column('task_id', Integer, ForeignKey('tasks.id', ondelete='CASCADE'), primary_key=True),
-    Column('depends_on_id', Integer, ForeignKey('tasks.id', ondelete='CASCADE'), primary_key=True)
+    # The primary key leads with task_id; blocker lookups need their own index
+    Column('depends_on_id', Integer, ForeignKey('tasks.id', ondelete='CASCADE'), primary_key=True, index=True)
 )
 
 
@@ -99,6 +100,10 @@ class User(Base):
 
 class Period(Base):
     __tablename__ = "periods"
+    __table_args__ = (
+        # Previous-period lookups by close type, newest first
+        Index("ix_periods_close_type_yr_mo", "close_type", "year", "month"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(100), nullable=False)  # e.g., "September 2025"
@@ -142,6 +147,13 @@ class TaskTemplate(Base):
 
     # Relationships
     tasks = relationship("Task", back_populates="template")
+    # Indexed copy of default_account_numbers, kept in sync by the validator below
+    account_links = relationship(
+        "TaskTemplateAccount",
+        back_populates="template",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+    )
     
     # Self-referential many-to-many for template dependencies
     dependencies = relationship(
@@ -152,9 +164,37 @@ class TaskTemplate(Base):
         backref="dependent_templates"
     )
 
+    @validates("default_account_numbers")
+    def _sync_account_links(self, key, value):
+        """Mirror the JSON list into task_template_accounts rows."""
+        numbers = dict.fromkeys(
+            str(number).strip() for number in (value or []) if number is not None and str(number).strip()
+        )
+        self.account_links = [TaskTemplateAccount(account_number=number) for number in numbers]
+        return value
+
+
+class TaskTemplateAccount(Base):
+    """Account number a template applies to (one row per template/account)."""
+    __tablename__ = "task_template_accounts"
+    
+    template_id = Column(Integer, ForeignKey("task_templates.id", ondelete="CASCADE"), primary_key=True)
+    account_number = Column(String(100), primary_key=True, index=True)
+    
+    template = relationship("TaskTemplate", back_populates="account_links")
+
 
 class Task(Base):
     __tablename__ = "tasks"
+    __table_args__ = (
+        # Dashboard counters and summaries, scoped by period and status
+        Index("ix_tasks_period_status", "period_id", "status"),
+        # Status lists ordered by due date
+        Index("ix_tasks_status_due", "status", "due_date"),
+        # "My tasks" lookups by owner or assignee
+        Index("ix_tasks_owner_status", "owner_id", "status"),
+        Index("ix_tasks_assignee_status", "assignee_id", "status"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     period_id = Column(Integer, ForeignKey("periods.id", ondelete="CASCADE"), nullable=False)
@@ -180,6 +220,11 @@ class Task(Base):
     notes = Column(Text, nullable=True)
     is_recurring = Column(Boolean, default=False)
     
+    # Denormalized from the task's most recent approval so task lists can show
+    # approval state without joining approvals; maintained by the approvals router
+    latest_approval_status = Column(Enum(ApprovalStatus), nullable=True, index=True)
+    latest_approval_at = Column(DateTime(timezone=True), nullable=True)
+    
     # Workflow visualization positions
     position_x = Column(Float, nullable=True)
     position_y = Column(Float, nullable=True)
@@ -209,9 +254,15 @@ class Task(Base):
 
 class File(Base):
     __tablename__ = "files"
+    __table_args__ = (
+        # Period-level files (task_id IS NULL) in the file cabinet
+        Index("ix_files_period_task_null", "period_id", "task_id"),
+        # Old-file reports by upload date
+        Index("ix_files_uploaded_at", "uploaded_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    task_id = Column(Integer, ForeignKey("tasks.id", ondelete="CASCADE"), nullable=True)
+    task_id = Column(Integer, ForeignKey("tasks.id", ondelete="CASCADE"), nullable=True, index=True)
     period_id = Column(Integer, ForeignKey("periods.id", ondelete="CASCADE"), nullable=True)
     
     filename = Column(String(255), nullable=False)
@@ -350,9 +401,17 @@ class TrialBalanceValidation(Base):
 
 class Approval(Base):
     __tablename__ = "approvals"
+    __table_args__ = (
+        # Serves "my approvals" with or without a status filter; also covers
+        # plain reviewer_id lookups
+        Index("ix_approvals_reviewer_status", "reviewer_id", "status"),
+    )
+    # Fetch server-generated columns with RETURNING at insert/update time
+    # instead of a follow-up SELECT
+    __mapper_args__ = {"eager_defaults": True}
     
     id = Column(Integer, primary_key=True, index=True)
-    task_id = Column(Integer, ForeignKey("tasks.id", ondelete="CASCADE"), nullable=False)
+    task_id = Column(Integer, ForeignKey("tasks.id", ondelete="CASCADE"), nullable=False, index=True)
     reviewer_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     
     status = Column(Enum(ApprovalStatus), default=ApprovalStatus.PENDING, nullable=False)
@@ -368,10 +427,11 @@ class Approval(Base):
 
 class AuditLog(Base):
     __tablename__ = "audit_logs"
+    __mapper_args__ = {"eager_defaults": True}
     
     id = Column(Integer, primary_key=True, index=True)
-    task_id = Column(Integer, ForeignKey("tasks.id", ondelete="CASCADE"), nullable=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    task_id = Column(Integer, ForeignKey("tasks.id", ondelete="CASCADE"), nullable=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
     
     action = Column(String(100), nullable=False)  # e.g., "created", "status_changed", "file_uploaded"
     entity_type = Column(String(50), nullable=False)  # e.g., "task", "file", "approval"
@@ -393,16 +453,23 @@ class AuditLog(Base):
 
 class Comment(Base):
     __tablename__ = "comments"
+    __table_args__ = (
+        # Serves the per-task comment list ordered newest first
+        Index("ix_comments_task_created", "task_id", text("created_at DESC")),
+    )
+    __mapper_args__ = {"eager_defaults": True}
     
     id = Column(Integer, primary_key=True, index=True)
     task_id = Column(Integer, ForeignKey("tasks.id", ondelete="CASCADE"), nullable=False)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
     
     content = Column(Text, nullable=False)
     is_internal = Column(Boolean, default=False)  # Internal notes vs shared comments
     
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    # SQL-level NULL default so eager_defaults returns it from the INSERT
+    # instead of selecting the onupdate column afterwards
+    updated_at = Column(DateTime(timezone=True), default=null(), onupdate=func.now())
     
     # Relationships
     task = relationship("Task", back_populates="comments")
@@ -411,6 +478,10 @@ class Comment(Base):
 
 class Notification(Base):
     __tablename__ = "notifications"
+    __table_args__ = (
+        # Per-user notification list, optionally unread only, newest first
+        Index("ix_notifications_user_unread", "user_id", "is_read", text("created_at DESC")),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
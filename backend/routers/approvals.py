@@ -1,7 +1,7 @@
 from typing import List
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from datetime import datetime
+from sqlalchemy import delete, func, lambda_stmt, select, update
+from sqlalchemy.orm import Session, selectinload
 
 from backend.database import get_db
 from backend.auth import get_current_user
@@ -17,6 +17,32 @@ from backend.schemas import Approval, ApprovalCreate, ApprovalUpdate, ApprovalWi
 router = APIRouter(prefix="/api/approvals", tags=["approvals"])
 
 
+def _task_exists(db: Session, task_id: int) -> bool:
+    """Check for a task with an EXISTS query instead of loading the row."""
+    return db.query(db.query(TaskModel.id).filter(TaskModel.id == task_id).exists()).scalar()
+
+
+def _set_latest_approval(db: Session, task_id: int, approval_status, approval_at) -> None:
+    """Copy the most recent approval activity onto its task (no task load)."""
+    db.execute(
+        update(TaskModel)
+        .where(TaskModel.id == task_id)
+        .values(latest_approval_status=approval_status, latest_approval_at=approval_at)
+    )
+
+
+def _recompute_latest_approval(db: Session, task_id: int) -> None:
+    """Re-derive a task's latest approval after one of its approvals is removed."""
+    activity_at = func.coalesce(ApprovalModel.reviewed_at, ApprovalModel.requested_at)
+    latest = db.execute(
+        select(ApprovalModel.status, activity_at)
+        .where(ApprovalModel.task_id == task_id)
+        .order_by(activity_at.desc(), ApprovalModel.id.desc())
+        .limit(1)
+    ).first()
+    _set_latest_approval(db, task_id, *(latest or (None, None)))
+
+
 @router.get("/task/{task_id}", response_model=List[ApprovalWithReviewer])
 async def get_task_approvals(
     task_id: int,
@@ -25,20 +51,12 @@ async def get_task_approvals(
 ):
     """Get all approvals for a specific task."""
     # Verify task exists
-    task = db.query(TaskModel).filter(TaskModel.id == task_id).first()
-    if not task:
+    if not _task_exists(db, task_id):
         raise HTTPException(status_code=404, detail="Task not found")
     
-    approvals = db.query(ApprovalModel).filter(ApprovalModel.task_id == task_id).all()
-    
-    result = []
-    for approval in approvals:
-        result.append({
-            **approval.__dict__,
-            "reviewer": approval.reviewer
-        })
-    
-    return result
+    stmt = select(ApprovalModel).options(selectinload(ApprovalModel.reviewer))\
+                                .where(ApprovalModel.task_id == task_id)
+    return db.execute(stmt).scalars().all()
 
 
 @router.get("/my-approvals", response_model=List[ApprovalWithReviewer])
@@ -48,21 +66,19 @@ async def get_my_approvals(
     current_user: UserModel = Depends(get_current_user)
 ):
     """Get approvals assigned to the current user."""
-    query = db.query(ApprovalModel).filter(ApprovalModel.reviewer_id == current_user.id)
+    # Each filter shape (with or without status) is cached as its own lambda
+    # statement; within a shape, the reviewer id and status are bound
+    # parameters rather than new cache entries.
+    reviewer_id = current_user.id
+    stmt = lambda_stmt(
+        lambda: select(ApprovalModel).options(selectinload(ApprovalModel.reviewer))
+                                     .where(ApprovalModel.reviewer_id == reviewer_id)
+    )
     
     if status:
-        query = query.filter(ApprovalModel.status == status)
+        stmt += lambda s: s.where(ApprovalModel.status == status)
     
-    approvals = query.all()
-    
-    result = []
-    for approval in approvals:
-        result.append({
-            **approval.__dict__,
-            "reviewer": approval.reviewer
-        })
-    
-    return result
+    return db.execute(stmt).scalars().all()
 
 
 @router.post("/", response_model=Approval, status_code=status.HTTP_201_CREATED)
@@ -73,20 +89,18 @@ async def create_approval(
 ):
     """Request an approval for a task."""
     # Verify task exists
-    task = db.query(TaskModel).filter(TaskModel.id == approval_data.task_id).first()
-    if not task:
+    if not _task_exists(db, approval_data.task_id):
         raise HTTPException(status_code=404, detail="Task not found")
     
     # Verify reviewer exists
-    reviewer = db.query(UserModel).filter(UserModel.id == approval_data.reviewer_id).first()
-    if not reviewer:
+    reviewer_name = db.query(UserModel.name).filter(UserModel.id == approval_data.reviewer_id).scalar()
+    if reviewer_name is None:
         raise HTTPException(status_code=404, detail="Reviewer not found")
     
     # Create approval
     db_approval = ApprovalModel(**approval_data.model_dump())
     db.add(db_approval)
-    db.commit()
-    db.refresh(db_approval)
+    db.flush()
     
     # Log approval request
     audit_log = AuditLogModel(
@@ -95,9 +109,11 @@ async def create_approval(
         action="approval_requested",
         entity_type="approval",
         entity_id=db_approval.id,
-        details=f"Requested approval from {reviewer.name}"
+        details=f"Requested approval from {reviewer_name}"
     )
     db.add(audit_log)
+    _set_latest_approval(db, approval_data.task_id, db_approval.status, func.now())
+
     db.commit()
     
     return db_approval
@@ -111,27 +127,55 @@ async def update_approval(
     current_user: UserModel = Depends(get_current_user)
 ):
     """Update an approval (approve, reject, or request revision)."""
-    approval = db.query(ApprovalModel).filter(ApprovalModel.id == approval_id).first()
-    if not approval:
-        raise HTTPException(status_code=404, detail="Approval not found")
+    # Stamp with the database clock; RETURNING hands the value back
+    values = {"status": approval_update.status, "reviewed_at": func.now()}
+    if approval_update.notes:
+        values["notes"] = approval_update.notes
+    stmt = (
+        update(ApprovalModel)
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    )
     
-    # Only the assigned reviewer can update the approval
-    if approval.reviewer_id != current_user.id:
+    if db.get_bind().dialect.name == "postgresql":
+        # One round trip: lock the current row and update it in one statement;
+        # the locked pre-update copy supplies the old status for the audit log
+        old = (
+            select(ApprovalModel.id, ApprovalModel.status)
+            .where(ApprovalModel.id == approval_id)
+            .with_for_update()
+            .subquery("old")
+        )
+        row = db.execute(
+            stmt.where(ApprovalModel.id == old.c.id, ApprovalModel.reviewer_id == current_user.id)
+            .returning(ApprovalModel, old.c.status)
+        ).first()
+    else:
+        # SQLite evaluates RETURNING after the change, so read the old status
+        # first within the same transaction
+        old_status = db.execute(
+            select(ApprovalModel.status).where(ApprovalModel.id == approval_id)
+        ).scalar()
+        approval = db.execute(
+            stmt.where(ApprovalModel.id == approval_id, ApprovalModel.reviewer_id == current_user.id)
+            .returning(ApprovalModel)
+        ).scalar()
+        row = (approval, old_status) if approval is not None else None
+    
+    if row is None:
+        # Nothing updated: tell a missing approval apart from someone else's
+        approval_exists = db.query(
+            db.query(ApprovalModel.id).filter(ApprovalModel.id == approval_id).exists()
+        ).scalar()
+        if not approval_exists:
+            raise HTTPException(status_code=404, detail="Approval not found")
+        # Only the assigned reviewer can update the approval
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Only the assigned reviewer can update this approval"
         )
     
-    old_status = approval.status
-    
-    # Update approval
-    approval.status = approval_update.status
-    if approval_update.notes:
-        approval.notes = approval_update.notes
-    approval.reviewed_at = datetime.utcnow()
-    
-    db.commit()
-    db.refresh(approval)
+    approval, old_status = row
     
     # Log approval update
     audit_log = AuditLogModel(
@@ -140,11 +184,13 @@ async def update_approval(
         action="approval_updated",
         entity_type="approval",
         entity_id=approval.id,
-        old_value=str(old_status),
-        new_value=str(approval_update.status),
+        old_value=old_status.value,
+        new_value=approval_update.status.value,
         details=approval_update.notes
     )
     db.add(audit_log)
+    _set_latest_approval(db, approval.task_id, approval.status, approval.reviewed_at)
+
     db.commit()
     
     return approval
@@ -157,21 +203,25 @@ async def delete_approval(
     current_user: UserModel = Depends(get_current_user)
 ):
     """Delete an approval request."""
-    approval = db.query(ApprovalModel).filter(ApprovalModel.id == approval_id).first()
-    if not approval:
+    # Single DELETE ... RETURNING instead of loading the row first
+    task_id = db.execute(
+        delete(ApprovalModel)
+        .where(ApprovalModel.id == approval_id)
+        .returning(ApprovalModel.task_id)
+    ).scalar()
+    if task_id is None:
         raise HTTPException(status_code=404, detail="Approval not found")
     
     # Log approval deletion
     audit_log = AuditLogModel(
-        task_id=approval.task_id,
+        task_id=task_id,
         user_id=current_user.id,
         action="approval_deleted",
         entity_type="approval",
-        entity_id=approval.id
+        entity_id=approval_id
     )
     db.add(audit_log)
-    
-    db.delete(approval)
+    _recompute_latest_approval(db, task_id)
     db.commit()
     
     return None
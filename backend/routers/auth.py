@@ -1,5 +1,6 @@
 from datetime import timedelta
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 
@@ -18,7 +19,8 @@ async def login(
     db: Session = Depends(get_db)
 ):
     """Login with email and password to get access token."""
-    user = authenticate_user(db, form_data.username, form_data.password)
+    # Password verification is CPU-bound; keep it off the event loop.
+    user = await run_in_threadpool(authenticate_user, db, form_data.username, form_data.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -49,7 +51,7 @@ async def register(
         )
     
     # Create new user
-    hashed_password = get_password_hash(user_data.password)
+    hashed_password = await run_in_threadpool(get_password_hash, user_data.password)
     db_user = UserModel(
         email=user_data.email,
         name=user_data.name,
@@ -1,6 +1,7 @@
 from typing import List
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import delete, lambda_stmt, select
+from sqlalchemy.orm import Session, selectinload
 
 from backend.database import get_db
 from backend.auth import get_current_user
@@ -15,6 +16,11 @@ from backend.schemas import Comment, CommentCreate, CommentUpdate, CommentWithUs
 router = APIRouter(prefix="/api/comments", tags=["comments"])
 
 
+def _task_exists(db: Session, task_id: int) -> bool:
+    """Check for a task with an EXISTS query instead of loading the row."""
+    return db.query(db.query(TaskModel.id).filter(TaskModel.id == task_id).exists()).scalar()
+
+
 @router.get("/task/{task_id}", response_model=List[CommentWithUser])
 async def get_task_comments(
     task_id: int,
@@ -23,21 +29,17 @@ async def get_task_comments(
 ):
     """Get all comments for a specific task."""
     # Verify task exists
-    task = db.query(TaskModel).filter(TaskModel.id == task_id).first()
-    if not task:
+    if not _task_exists(db, task_id):
         raise HTTPException(status_code=404, detail="Task not found")
     
-    comments = db.query(CommentModel).filter(CommentModel.task_id == task_id)\
-                                     .order_by(CommentModel.created_at.desc()).all()
-    
-    result = []
-    for comment in comments:
-        result.append({
-            **comment.__dict__,
-            "user": comment.user
-        })
-    
-    return result
+    # lambda_stmt caches the statement by the lambda's code location, so the
+    # query is not rebuilt and re-keyed on every call; task_id is bound.
+    stmt = lambda_stmt(
+        lambda: select(CommentModel).options(selectinload(CommentModel.user))
+                                    .where(CommentModel.task_id == task_id)
+                                    .order_by(CommentModel.created_at.desc())
+    )
+    return db.execute(stmt).scalars().all()
 
 
 @router.post("/", response_model=Comment, status_code=status.HTTP_201_CREATED)
@@ -48,8 +50,7 @@ async def create_comment(
 ):
     """Create a new comment on a task."""
     # Verify task exists
-    task = db.query(TaskModel).filter(TaskModel.id == comment_data.task_id).first()
-    if not task:
+    if not _task_exists(db, comment_data.task_id):
         raise HTTPException(status_code=404, detail="Task not found")
     
     # Create comment
@@ -74,7 +75,6 @@ async def create_comment(
     db.add(audit_log)
 
     db.commit()
-    db.refresh(db_comment)
 
     return db_comment
 
@@ -103,7 +103,6 @@ async def update_comment(
         comment.is_internal = update_data.is_internal
 
     db.commit()
-    db.refresh(comment)
 
     return comment
 
@@ -115,18 +114,25 @@ async def delete_comment(
     current_user: UserModel = Depends(get_current_user)
 ):
     """Delete a comment (only by the author)."""
-    comment = db.query(CommentModel).filter(CommentModel.id == comment_id).first()
-    if not comment:
-        raise HTTPException(status_code=404, detail="Comment not found")
+    # Delete in one statement; the author check is part of the WHERE clause
+    deleted_id = db.execute(
+        delete(CommentModel)
+        .where(CommentModel.id == comment_id, CommentModel.user_id == current_user.id)
+        .returning(CommentModel.id)
+    ).scalar()
     
-    # Only the comment author can delete it
-    if comment.user_id != current_user.id:
+    if deleted_id is None:
+        # Nothing deleted: tell a missing comment apart from someone else's
+        comment_exists = db.query(
+            db.query(CommentModel.id).filter(CommentModel.id == comment_id).exists()
+        ).scalar()
+        if not comment_exists:
+            raise HTTPException(status_code=404, detail="Comment not found")
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="You can only delete your own comments"
         )
     
-    db.delete(comment)
     db.commit()
     
     return None
@@ -1,23 +1,26 @@
-from typing import Dict, List, Tuple, Optional
+import hashlib
+from typing import Dict, List, Optional
 
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from sqlalchemy import func, or_
+from fastapi import APIRouter, Depends, Header, Response
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session, aliased, contains_eager, raiseload, selectinload
+from sqlalchemy import case, func, select, union_all
+from sqlalchemy.exc import SQLAlchemyError
 from datetime import datetime, timedelta, timezone
 
 from backend.database import get_db
 from backend.auth import get_current_user
 from backend.models import (
     Task as TaskModel,
-    Period as PeriodModel,
     User as UserModel,
     TaskStatus,
-    PeriodStatus,
     Approval as ApprovalModel,
     ApprovalStatus,
     File as FileModel,
     task_dependencies
 )
+from backend.services.dashboard_cache import DashboardStatsCache
+from backend.services.period_cache import get_active_period_ids, get_open_period_ids
 from backend.schemas import (
     DashboardStats,
     TaskSummary,
@@ -30,172 +33,198 @@ from backend.schemas import (
 router = APIRouter(prefix="/api/dashboard", tags=["dashboard"])
 
 
+def _task_summary(row) -> TaskSummary:
+    """TaskSummary from a row of typed task columns.
+
+    The values come straight from SQLAlchemy-typed columns, so validation is
+    skipped.
+    """
+    return TaskSummary.model_construct(id=row.id, name=row.name, status=row.status, due_date=row.due_date)
+
+
+def _hours_between(db: Session, start, end):
+    """SQL expression for the hours elapsed between two timestamp columns."""
+    if db.get_bind().dialect.name == "sqlite":
+        return (func.julianday(end) - func.julianday(start)) * 24
+    return func.extract("epoch", end - start) / 3600
+
+
+def _stats_response(payload, cache_status: str, if_none_match: Optional[str]) -> Response:
+    """JSON response for a stats payload, or 304 when the client's copy matches.
+
+    The ETag is a hash of the payload itself, so it changes whenever any
+    figure changes, including ones driven by the clock (overdue, due today).
+    """
+    if isinstance(payload, str):
+        payload = payload.encode()
+    etag = f'W/"{hashlib.sha1(payload).hexdigest()}"'
+    headers = {"X-Cache": cache_status, "ETag": etag, "Cache-Control": "private, no-cache"}
+    if if_none_match and etag in (tag.strip() for tag in if_none_match.split(",")):
+        return Response(status_code=304, headers=headers)
+    return Response(content=payload, media_type="application/json", headers=headers)
+
+
 @router.get("/stats", response_model=DashboardStats)
 async def get_dashboard_stats(
     period_id: int = None,
+    if_none_match: Optional[str] = Header(None),
     db: Session = Depends(get_db),
     current_user: UserModel = Depends(get_current_user)
 ):
     """Get overall dashboard statistics."""
-    query = db.query(TaskModel)
+    # Stats don't depend on the user, so all users share one entry per scope
+    scope = str(period_id) if period_id else "active"
     
-    # Filter by period if specified
-    if period_id:
-        query = query.filter(TaskModel.period_id == period_id)
-    else:
-        # Default to current/active periods
-        active_periods = db.query(PeriodModel).filter(
-            PeriodModel.status.in_([PeriodStatus.IN_PROGRESS, PeriodStatus.UNDER_REVIEW])
-        ).all()
-        period_ids = [p.id for p in active_periods]
-        if period_ids:
-            query = query.filter(TaskModel.period_id.in_(period_ids))
-    
-    tasks = query.all()
+    cached, epoch = await DashboardStatsCache.get(scope)
+    if cached is not None:
+        return _stats_response(cached, "HIT", if_none_match)
     
-    total_tasks = len(tasks)
-    completed_tasks = sum(1 for t in tasks if t.status == TaskStatus.COMPLETE)
-    in_progress_tasks = sum(1 for t in tasks if t.status == TaskStatus.IN_PROGRESS)
+    try:
+        # The queries block, so run them off the event loop
+        stats = await run_in_threadpool(_compute_dashboard_stats, db, period_id)
+    except SQLAlchemyError:
+        # Serve the last good payload rather than failing the dashboard
+        stale = await DashboardStatsCache.get_stale(scope)
+        if stale is None:
+            raise
+        return _stats_response(stale, "STALE", if_none_match)
     
-    # Calculate overdue tasks using a single timezone-aware reference
-    now_utc = datetime.now(timezone.utc)
-    far_future = now_utc + timedelta(days=3650)
+    payload = stats.model_dump_json()
+    await DashboardStatsCache.set(scope, epoch, payload)
+    return _stats_response(payload, "MISS", if_none_match)
 
-    def ensure_aware(dt: Optional[datetime]) -> Optional[datetime]:
-        if dt is None:
-            return None
-        if dt.tzinfo is None:
-            return dt.replace(tzinfo=timezone.utc)
-        return dt.astimezone(timezone.utc)
 
-    overdue_tasks = sum(
-        1
-        for t in tasks
-        if (due_date := ensure_aware(t.due_date)) and due_date < now_utc and t.status != TaskStatus.COMPLETE
-    )
+def _compute_dashboard_stats(db: Session, period_id: Optional[int]) -> DashboardStats:
+    """Build dashboard statistics for one period, or all active periods."""
+    # Filter by period if specified, else default to current/active periods
+    period_ids = [] if period_id else get_open_period_ids(db)
+
+    def in_scope(entity) -> list:
+        """Period criteria for TaskModel or an alias of it."""
+        if period_id:
+            return [entity.period_id == period_id]
+        return [entity.period_id.in_(period_ids)] if period_ids else []
+
+    scope = in_scope(TaskModel)
     
-    # Tasks due today
+    # Single timezone-aware reference for all date predicates
+    now_utc = datetime.now(timezone.utc)
     today_start = now_utc.replace(hour=0, minute=0, second=0, microsecond=0)
     today_end = today_start + timedelta(days=1)
-    tasks_due_today = sum(
-        1
-        for t in tasks
-        if (due_date := ensure_aware(t.due_date)) and today_start <= due_date < today_end and t.status != TaskStatus.COMPLETE
-    )
+    at_risk_deadline = now_utc + timedelta(days=2)
+
+    is_complete = TaskModel.status == TaskStatus.COMPLETE
+    is_open = TaskModel.status != TaskStatus.COMPLETE
+    
+    # All counters in one aggregate query instead of loading every task
+    counts = db.query(
+        func.count(TaskModel.id).label("total"),
+        func.count(TaskModel.id).filter(is_complete).label("completed"),
+        func.count(TaskModel.id).filter(TaskModel.status == TaskStatus.IN_PROGRESS).label("in_progress"),
+        func.count(TaskModel.id).filter(is_open, TaskModel.due_date < now_utc).label("overdue"),
+        func.count(TaskModel.id).filter(
+            is_open, TaskModel.due_date >= today_start, TaskModel.due_date < today_end
+        ).label("due_today"),
+        func.avg(_hours_between(db, TaskModel.started_at, TaskModel.completed_at)).filter(
+            is_complete, TaskModel.started_at.isnot(None), TaskModel.completed_at.isnot(None)
+        ).label("avg_hours"),
+    ).filter(*scope).one()
+    
+    total_tasks = counts.total
+    completed_tasks = counts.completed
+    in_progress_tasks = counts.in_progress
+    overdue_tasks = counts.overdue
+    tasks_due_today = counts.due_today
     
     # Calculate completion percentage
     completion_percentage = (completed_tasks / total_tasks * 100) if total_tasks > 0 else 0
     
     # Calculate average time to complete
-    completed_with_times = [
-        t for t in tasks 
-        if t.status == TaskStatus.COMPLETE and t.started_at and t.completed_at
-    ]
+    avg_time_to_complete = float(counts.avg_hours) if counts.avg_hours is not None else None
     
-    avg_time_to_complete = None
-    if completed_with_times:
-        total_hours = sum(
-            (
-                (ensure_aware(t.completed_at) - ensure_aware(t.started_at)).total_seconds() / 3600
-            )
-            for t in completed_with_times
+    def summary_rows(*criteria) -> List[TaskSummary]:
+        """The five soonest-due tasks matching the criteria (undated last)."""
+        rows = (
+            db.query(TaskModel.id, TaskModel.name, TaskModel.status, TaskModel.due_date)
+            .filter(*scope, *criteria)
+            .order_by(TaskModel.due_date.asc().nulls_last(), TaskModel.id)
+            .limit(5)
+            .all()
         )
-        avg_time_to_complete = total_hours / len(completed_with_times)
-    
-    def to_summary(task: TaskModel) -> TaskSummary:
-        return TaskSummary(id=task.id, name=task.name, status=task.status, due_date=task.due_date)
+        return [_task_summary(row) for row in rows]
 
-    blocked_tasks = [to_summary(t) for t in tasks if t.status == TaskStatus.BLOCKED]
-    review_tasks = [to_summary(t) for t in tasks if t.status == TaskStatus.REVIEW]
+    blocked_tasks = summary_rows(TaskModel.status == TaskStatus.BLOCKED)
+    review_tasks = summary_rows(TaskModel.status == TaskStatus.REVIEW)
+    at_risk_tasks = summary_rows(is_open, TaskModel.due_date <= at_risk_deadline)
 
-    at_risk_deadline = now_utc + timedelta(days=2)
-    at_risk_tasks = [
-        to_summary(t)
-        for t in tasks
-        if t.status != TaskStatus.COMPLETE
-        and (due_date := ensure_aware(t.due_date))
-        and due_date <= at_risk_deadline
-    ]
-
-    def summary_sort_key(summary: TaskSummary) -> datetime:
-        return ensure_aware(summary.due_date) or far_future
-
-    blocked_tasks.sort(key=summary_sort_key)
-    review_tasks.sort(key=summary_sort_key)
-    at_risk_tasks.sort(key=summary_sort_key)
+    # Critical path: open tasks ranked by how many open tasks they block,
+    # aggregated and limited in SQL
+    dependent = aliased(TaskModel)
+    blocked_counts = (
+        select(
+            task_dependencies.c.depends_on_id.label("blocker_id"),
+            func.count().label("blocked_count"),
+        )
+        .join(dependent, dependent.id == task_dependencies.c.task_id)
+        .where(*in_scope(dependent), dependent.status != TaskStatus.COMPLETE)
+        .group_by(task_dependencies.c.depends_on_id)
+        .subquery()
+    )
+    overdue_first = case((TaskModel.due_date < now_utc, 0), else_=1)
+    blockers = (
+        db.query(
+            TaskModel.id,
+            TaskModel.name,
+            TaskModel.status,
+            TaskModel.due_date,
+            blocked_counts.c.blocked_count,
+        )
+        .join(blocked_counts, blocked_counts.c.blocker_id == TaskModel.id)
+        .filter(*scope, is_open)
+        .order_by(
+            overdue_first,
+            TaskModel.due_date.asc().nulls_last(),
+            blocked_counts.c.blocked_count.desc(),
+            TaskModel.id,
+        )
+        .limit(5)
+        .all()
+    )
 
     critical_path_items: List[CriticalPathItem] = []
-    task_ids = [task.id for task in tasks]
 
-    if task_ids:
+    if blockers:
+        # One query for the open dependents of the chosen blockers
         dependency_rows = (
             db.query(
                 task_dependencies.c.depends_on_id.label("blocker_id"),
-                TaskModel.id.label("dependent_id"),
-                TaskModel.name.label("dependent_name"),
-                TaskModel.status.label("dependent_status"),
-                TaskModel.due_date.label("dependent_due"),
+                dependent.id,
+                dependent.name,
+                dependent.status,
+                dependent.due_date,
             )
-            .join(TaskModel, TaskModel.id == task_dependencies.c.task_id)
-            .filter(task_dependencies.c.depends_on_id.in_(task_ids))
-            .filter(TaskModel.id.in_(task_ids))
+            .join(dependent, dependent.id == task_dependencies.c.task_id)
+            .filter(task_dependencies.c.depends_on_id.in_([row.id for row in blockers]))
+            .filter(*in_scope(dependent), dependent.status != TaskStatus.COMPLETE)
+            .order_by(dependent.due_date.asc().nulls_last(), dependent.id)
             .all()
         )
 
         dependents_by_blocker: Dict[int, List[TaskSummary]] = {}
-
         for row in dependency_rows:
-            dependent_status = row.dependent_status
-            if dependent_status == TaskStatus.COMPLETE:
-                continue
+            dependents_by_blocker.setdefault(row.blocker_id, []).append(_task_summary(row))
 
-            dependents_by_blocker.setdefault(row.blocker_id, []).append(
-                TaskSummary(
-                    id=row.dependent_id,
-                    name=row.dependent_name,
-                    status=dependent_status,
-                    due_date=row.dependent_due,
-                )
+        critical_path_items = [
+            CriticalPathItem.model_construct(
+                id=row.id,
+                name=row.name,
+                status=row.status,
+                due_date=row.due_date,
+                blocked_dependents=row.blocked_count,
+                dependents=dependents_by_blocker.get(row.id, []),
             )
-
-        if dependents_by_blocker:
-            reference_now = now_utc
-            candidates: List[Tuple[TaskModel, List[TaskSummary], int, int]] = []
-
-            for task in tasks:
-                dependents = dependents_by_blocker.get(task.id)
-                if not dependents:
-                    continue
-
-                if task.status == TaskStatus.COMPLETE:
-                    continue
-
-                dependents.sort(key=summary_sort_key)
-                blocked_count = len(dependents)
-                task_due = ensure_aware(task.due_date)
-                overdue_flag = 0 if task_due and task_due < reference_now else 1
-
-                candidates.append((task, dependents, blocked_count, overdue_flag))
-
-            candidates.sort(
-                key=lambda item: (
-                    item[3],
-                    ensure_aware(item[0].due_date) or far_future,
-                    -item[2],
-                )
-            )
-
-            critical_path_items = [
-                CriticalPathItem(
-                    id=task.id,
-                    name=task.name,
-                    status=task.status,
-                    due_date=task.due_date,
-                    blocked_dependents=blocked_count,
-                    dependents=dependents,
-                )
-                for task, dependents, blocked_count, _ in candidates[:5]
-            ]
+            for row in blockers
+        ]
 
     return DashboardStats(
         total_tasks=total_tasks,
@@ -205,77 +234,87 @@ async def get_dashboard_stats(
         tasks_due_today=tasks_due_today,
         completion_percentage=round(completion_percentage, 2),
         avg_time_to_complete=round(avg_time_to_complete, 2) if avg_time_to_complete else None,
-        blocked_tasks=blocked_tasks[:5],
-        review_tasks=review_tasks[:5],
-        at_risk_tasks=at_risk_tasks[:5],
+        blocked_tasks=blocked_tasks,
+        review_tasks=review_tasks,
+        at_risk_tasks=at_risk_tasks,
         critical_path_tasks=critical_path_items,
     )
 
 
 @router.get("/my-reviews", response_model=MyReviewsResponse)
-async def get_my_reviews(
+def get_my_reviews(
     period_id: int = None,
     db: Session = Depends(get_db),
     current_user: UserModel = Depends(get_current_user)
 ):
-    """Get all items awaiting review by the current user."""
-    # Get tasks in review status where user is owner or assignee
+    """Get all items awaiting review by the current user.
+
+    Declared sync so FastAPI runs its blocking queries in the threadpool
+    instead of on the event loop.
+    """
+    # Resolve the period scope once so neither query needs to join periods
+    if period_id:
+        period_ids = [period_id]
+    else:
+        period_ids = get_active_period_ids(db)
+
+    # File count and overdue flag come back with each task row
+    file_count = (
+        select(func.count(FileModel.id))
+        .where(FileModel.task_id == TaskModel.id)
+        .correlate(TaskModel)
+        .scalar_subquery()
+    )
+    is_overdue = case((TaskModel.due_date < datetime.now(timezone.utc), True), else_=False)
+
+    # Get tasks in review status where user is owner or assignee. Each branch
+    # of the UNION ALL uses its own (owner_id/assignee_id, status) index,
+    # where an OR across the two columns tends not to; the second branch
+    # skips owned tasks so none appears twice.
+    my_review_task_ids = union_all(
+        select(TaskModel.id).where(
+            TaskModel.owner_id == current_user.id,
+            TaskModel.status == TaskStatus.REVIEW,
+        ),
+        select(TaskModel.id).where(
+            TaskModel.assignee_id == current_user.id,
+            TaskModel.owner_id != current_user.id,
+            TaskModel.status == TaskStatus.REVIEW,
+        ),
+    ).subquery()
     tasks_query = (
-        db.query(TaskModel)
-        .join(PeriodModel)
-        .filter(TaskModel.status == TaskStatus.REVIEW)
-        .filter(
-            or_(
-                TaskModel.owner_id == current_user.id,
-                TaskModel.assignee_id == current_user.id
-            )
+        db.query(TaskModel, file_count, is_overdue)
+        .join(my_review_task_ids, my_review_task_ids.c.id == TaskModel.id)
+        .filter(TaskModel.period_id.in_(period_ids))
+        .options(
+            selectinload(TaskModel.assignee),
+            selectinload(TaskModel.period),
+            raiseload("*"),
         )
     )
     
-    if period_id:
-        tasks_query = tasks_query.filter(TaskModel.period_id == period_id)
-    else:
-        tasks_query = tasks_query.filter(PeriodModel.is_active == True)
-    
     tasks = tasks_query.order_by(TaskModel.due_date.asc()).all()
     
     # Get pending approvals assigned to user
     approvals_query = (
-        db.query(ApprovalModel)
+        db.query(ApprovalModel, file_count, is_overdue)
         .join(TaskModel, ApprovalModel.task_id == TaskModel.id)
-        .join(PeriodModel, TaskModel.period_id == PeriodModel.id)
         .filter(ApprovalModel.reviewer_id == current_user.id)
         .filter(ApprovalModel.status == ApprovalStatus.PENDING)
+        .filter(TaskModel.period_id.in_(period_ids))
+        .options(
+            contains_eager(ApprovalModel.task).selectinload(TaskModel.assignee),
+            contains_eager(ApprovalModel.task).selectinload(TaskModel.period),
+            contains_eager(ApprovalModel.task).raiseload("*"),
+            raiseload("*"),
+        )
     )
     
-    if period_id:
-        approvals_query = approvals_query.filter(TaskModel.period_id == period_id)
-    else:
-        approvals_query = approvals_query.filter(PeriodModel.is_active == True)
-    
     approvals = approvals_query.order_by(ApprovalModel.requested_at.asc()).all()
 
-    now_aware = datetime.now(timezone.utc)
-    now_naive = now_aware.replace(tzinfo=None)
-
-    def is_overdue_due_date(due_date: datetime | None) -> bool:
-        if not due_date:
-            return False
-        if due_date.tzinfo is None:
-            return due_date < now_naive
-        return due_date.astimezone(timezone.utc) < now_aware
-    
     # Build review tasks
-    review_tasks = []
-    overdue_count = 0
-    
-    for task in tasks:
-        file_count = db.query(FileModel).filter(FileModel.task_id == task.id).count()
-        is_overdue = is_overdue_due_date(task.due_date)
-        if is_overdue:
-            overdue_count += 1
-        
-        review_tasks.append(ReviewTask(
+    review_tasks = [
+        ReviewTask(
             id=task.id,
             name=task.name,
             description=task.description,
@@ -283,34 +322,34 @@ async def get_my_reviews(
             due_date=task.due_date,
             assignee=task.assignee,
             period=task.period,
-            file_count=file_count,
-            is_overdue=is_overdue,
+            file_count=task_file_count,
+            is_overdue=task_overdue,
             department=task.department
-        ))
+        )
+        for task, task_file_count, task_overdue in tasks
+    ]
     
     # Build approval items
-    pending_approvals = []
-    
-    for approval in approvals:
-        task = approval.task
-        file_count = db.query(FileModel).filter(FileModel.task_id == task.id).count()
-        is_overdue = is_overdue_due_date(task.due_date)
-        if is_overdue:
-            overdue_count += 1
-        
-        pending_approvals.append(ReviewApproval(
+    pending_approvals = [
+        ReviewApproval(
             id=approval.id,
-            task_id=task.id,
-            task_name=task.name,
+            task_id=approval.task.id,
+            task_name=approval.task.name,
             status=approval.status,
             notes=approval.notes,
             requested_at=approval.requested_at,
-            period=task.period,
-            assignee=task.assignee,
-            file_count=file_count,
-            is_overdue=is_overdue
-        ))
+            period=approval.task.period,
+            assignee=approval.task.assignee,
+            file_count=task_file_count,
+            is_overdue=task_overdue
+        )
+        for approval, task_file_count, task_overdue in approvals
+    ]
     
+    # A task in review can also have a pending approval; count it once
+    overdue_task_ids = {task.id for task in review_tasks if task.is_overdue}
+    overdue_task_ids.update(approval.task_id for approval in pending_approvals if approval.is_overdue)
+    overdue_count = len(overdue_task_ids)
     total_pending = len(review_tasks) + len(pending_approvals)
     
     return MyReviewsResponse(
@@ -1,12 +1,16 @@
-from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File as FastAPIFile
+from typing import List, Optional, Tuple
+from fastapi import APIRouter, BackgroundTasks, Depends, Header, HTTPException, status, UploadFile, File as FastAPIFile, Form
 from fastapi.responses import StreamingResponse, FileResponse
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import func, or_, select, update
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session, joinedload, raiseload, selectinload, sessionmaker
 import os
 import uuid
-from datetime import datetime, timedelta
+import aiofiles
+from operator import attrgetter
+from datetime import date, datetime, timedelta
 
-from backend.database import get_db
+from backend.database import get_db, get_session_factory
 from backend.auth import get_current_user
 from backend.models import (
     File as FileModel, 
@@ -26,10 +30,118 @@ from backend.schemas import (
     TrialBalanceFileInfo
 )
 from backend.config import settings
-from backend.services.file_archiver import create_period_zip_archive, estimate_zip_size
+from backend.services.file_archiver import create_period_zip_archive
+from backend.services.period_cache import get_previous_period_id
 
 router = APIRouter(prefix="/api/files", tags=["files"])
 
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+ACCESS_STAMP_INTERVAL = timedelta(minutes=1)
+
+
+async def _save_upload(upload: UploadFile, file_path: str) -> int:
+    """Stream an upload to disk in chunks and return its size in bytes.
+
+    Only one chunk is held in memory at a time. Uploads over the size limit
+    are rejected with 413 and the partial file is removed.
+    """
+    max_size_bytes = settings.max_file_size_mb * 1024 * 1024
+    file_size = 0
+    try:
+        async with aiofiles.open(file_path, "wb") as buffer:
+            while chunk := await upload.read(UPLOAD_CHUNK_SIZE):
+                file_size += len(chunk)
+                if file_size > max_size_bytes:
+                    raise HTTPException(
+                        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                        detail=f"File size exceeds maximum allowed size of {settings.max_file_size_mb}MB"
+                    )
+                await buffer.write(chunk)
+    except HTTPException:
+        os.remove(file_path)
+        raise
+    return file_size
+
+
+def _parse_byte_range(range_header: str, file_size: int) -> Optional[Tuple[int, int]]:
+    """Parse a single "bytes=start-end" Range header into inclusive offsets.
+
+    Returns None when the header should be ignored (malformed, another unit or
+    several ranges) so the whole file is served. Raises 416 when the range
+    starts past the end of the file.
+    """
+    unit, _, spec = range_header.partition("=")
+    start_text, dash, end_text = spec.strip().partition("-")
+    if unit.strip().lower() != "bytes" or "," in spec or not dash:
+        return None
+    try:
+        if start_text:
+            start = int(start_text)
+            end = int(end_text) if end_text else file_size - 1
+        else:
+            # Suffix range: the last N bytes
+            start = max(file_size - int(end_text), 0)
+            end = file_size - 1 if int(end_text) else -1
+    except ValueError:
+        return None
+    if start_text and end_text and end < start:
+        return None
+    if start >= file_size or end < 0:
+        raise HTTPException(
+            status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+            detail="Requested range not satisfiable",
+            headers={"Content-Range": f"bytes */{file_size}"}
+        )
+    return start, min(end, file_size - 1)
+
+
+async def _iter_file_range(file_path: str, start: int, length: int):
+    """Yield `length` bytes of a file from `start`, one chunk at a time."""
+    async with aiofiles.open(file_path, "rb") as source:
+        await source.seek(start)
+        while length > 0:
+            chunk = await source.read(min(UPLOAD_CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+def _access_stamp_cutoff(db: Session):
+    """SQL expression for ACCESS_STAMP_INTERVAL before the database's now."""
+    if db.get_bind().dialect.name == "postgresql":
+        return func.now() - ACCESS_STAMP_INTERVAL
+    # SQLite has no interval arithmetic; datetime() applies the offset
+    return func.datetime("now", f"-{int(ACCESS_STAMP_INTERVAL.total_seconds())} seconds")
+
+
+def _record_file_access(session_factory: sessionmaker, file_id: int) -> None:
+    """Stamp a file's last_accessed_at; runs as a background task.
+
+    The request's session is closed by the time background tasks run, so this
+    opens its own. Rows stamped within the last ACCESS_STAMP_INTERVAL are left
+    alone, so repeated downloads don't rewrite the row each time. Both the
+    stamp and the cutoff use the database clock.
+    """
+    db = session_factory()
+    try:
+        db.execute(
+            update(FileModel)
+            .where(
+                FileModel.id == file_id,
+                or_(
+                    FileModel.last_accessed_at.is_(None),
+                    FileModel.last_accessed_at < _access_stamp_cutoff(db),
+                ),
+            )
+            .values(last_accessed_at=func.now())
+        )
+        db.commit()
+    except SQLAlchemyError as e:
+        print(f"Failed to record access for file {file_id}: {str(e)}")
+    finally:
+        db.close()
+
 
 def get_file_age_days(file: FileModel) -> int:
     """Calculate file age in days."""
@@ -39,73 +151,44 @@ def get_file_age_days(file: FileModel) -> int:
 
 
 def _find_previous_period(db: Session, period: PeriodModel) -> Optional[PeriodModel]:
-    prev_month = period.month - 1
-    prev_year = period.year
-    if prev_month <= 0:
-        prev_month = 12
-        prev_year -= 1
-
-    candidate = (
-        db.query(PeriodModel)
-        .filter(
-            PeriodModel.close_type == period.close_type,
-            PeriodModel.year == prev_year,
-            PeriodModel.month == prev_month,
-        )
-        .order_by(PeriodModel.id.desc())
-        .first()
-    )
-    if candidate:
-        return candidate
-
-    return (
-        db.query(PeriodModel)
-        .filter(PeriodModel.close_type == period.close_type)
-        .filter(
-            (PeriodModel.year < period.year)
-            | ((PeriodModel.year == period.year) & (PeriodModel.month < period.month))
-        )
-        .order_by(PeriodModel.year.desc(), PeriodModel.month.desc())
-        .first()
-    )
+    previous_id = get_previous_period_id(db, period)
+    return db.get(PeriodModel, previous_id) if previous_id is not None else None
+
+
+# FileWithUser fields, read off a file in one attrgetter call per row
+_FILE_WITH_USER_KEYS = tuple(FileWithUser.model_fields)
+_file_with_user_values = attrgetter(*_FILE_WITH_USER_KEYS)
+
+
+def _with_user(file: FileModel) -> dict:
+    return dict(zip(_FILE_WITH_USER_KEYS, _file_with_user_values(file)))
 
 
 def _build_file_cabinet_structure(db: Session, period: PeriodModel) -> FileCabinetStructure:
     period_id = period.id
 
-    period_files = db.query(FileModel).options(joinedload(FileModel.task)).filter(
+    # raiseload keeps any relationship that isn't eager-loaded here from
+    # quietly issuing a query per row
+    period_files = db.query(FileModel).options(
+        joinedload(FileModel.uploaded_by),
+        raiseload("*"),
+    ).filter(
         FileModel.period_id == period_id,
         FileModel.task_id.is_(None)
     ).all()
 
-    def _with_user(file: FileModel):
-        uploaded_by = None
-        if file.uploaded_by_id:
-            uploaded_by = db.query(UserModel).filter(UserModel.id == file.uploaded_by_id).first()
-        return {
-            "id": file.id,
-            "task_id": file.task_id,
-            "period_id": file.period_id,
-            "filename": file.filename,
-            "original_filename": file.original_filename,
-            "file_size": file.file_size,
-            "mime_type": file.mime_type,
-            "description": file.description,
-            "file_date": file.file_date,
-            "is_external_link": file.is_external_link,
-            "external_url": file.external_url,
-            "uploaded_at": file.uploaded_at,
-            "last_accessed_at": file.last_accessed_at,
-            "uploaded_by": uploaded_by,
-        }
-
     period_files_with_user = [_with_user(file) for file in period_files]
 
-    tasks = db.query(TaskModel).filter(TaskModel.period_id == period_id).all()
+    # Files for every task in one IN query, instead of one query per task
+    task_files = selectinload(TaskModel.files)
+    tasks = db.query(TaskModel).options(
+        task_files.joinedload(FileModel.uploaded_by),
+        task_files.raiseload("*"),
+        raiseload("*"),
+    ).filter(TaskModel.period_id == period_id).all()
     task_files_list = []
     for task in tasks:
-        task_files = db.query(FileModel).filter(FileModel.task_id == task.id).all()
-        files_with_user = [_with_user(file) for file in task_files]
+        files_with_user = [_with_user(file) for file in task.files]
         task_files_list.append(
             {
                 "id": task.id,
@@ -115,33 +198,38 @@ def _build_file_cabinet_structure(db: Session, period: PeriodModel) -> FileCabin
             }
         )
 
-    trial_balance_files = []
-    trial_balances = db.query(TrialBalanceModel).filter(
-        TrialBalanceModel.period_id == period_id
-    ).options(joinedload(TrialBalanceModel.accounts)).all()
-
-    for tb in trial_balances:
-        for account in tb.accounts:
-            attachments = db.query(TrialBalanceAttachmentModel).filter(
-                TrialBalanceAttachmentModel.account_id == account.id
-            ).all()
-            for attachment in attachments:
-                trial_balance_files.append(
-                    {
-                        "id": attachment.id,
-                        "account_id": account.id,
-                        "account_number": account.account_number,
-                        "account_name": account.account_name,
-                        "filename": attachment.filename,
-                        "original_filename": attachment.original_filename,
-                        "file_size": attachment.file_size,
-                        "mime_type": attachment.mime_type,
-                        "description": attachment.description,
-                        "file_date": attachment.file_date,
-                        "uploaded_at": attachment.uploaded_at,
-                        "file_path": attachment.file_path,
-                    }
-                )
+    # Every attachment on the period's trial balances, with its account, in one query
+    attachment_rows = (
+        db.query(
+            TrialBalanceAttachmentModel,
+            TrialBalanceAccountModel.account_number,
+            TrialBalanceAccountModel.account_name,
+        )
+        .join(TrialBalanceAccountModel, TrialBalanceAttachmentModel.account_id == TrialBalanceAccountModel.id)
+        .join(TrialBalanceModel, TrialBalanceAccountModel.trial_balance_id == TrialBalanceModel.id)
+        .filter(TrialBalanceModel.period_id == period_id)
+        .options(raiseload("*"))
+        .order_by(TrialBalanceModel.id, TrialBalanceAccountModel.id, TrialBalanceAttachmentModel.id)
+        .all()
+    )
+
+    trial_balance_files = [
+        {
+            "id": attachment.id,
+            "account_id": attachment.account_id,
+            "account_number": account_number,
+            "account_name": account_name,
+            "filename": attachment.filename,
+            "original_filename": attachment.original_filename,
+            "file_size": attachment.file_size,
+            "mime_type": attachment.mime_type,
+            "description": attachment.description,
+            "file_date": attachment.file_date,
+            "uploaded_at": attachment.uploaded_at,
+            "file_path": attachment.file_path,
+        }
+        for attachment, account_number, account_name in attachment_rows
+    ]
 
     return {
         "period": period,
@@ -161,14 +249,16 @@ async def get_task_files(
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
     
-    files = db.query(FileModel).filter(FileModel.task_id == task_id).all()
+    files = db.query(FileModel).filter(FileModel.task_id == task_id).options(raiseload("*")).all()
     return files
 
 
 @router.get("/{file_id}", response_model=File)
 async def get_file(
     file_id: int,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
+    session_factory: sessionmaker = Depends(get_session_factory),
     current_user: UserModel = Depends(get_current_user)
 ):
     """Get a specific file by ID."""
@@ -176,9 +266,8 @@ async def get_file(
     if not file:
         raise HTTPException(status_code=404, detail="File not found")
     
-    # Update last accessed timestamp
-    file.last_accessed_at = datetime.utcnow()
-    db.commit()
+    # Update last accessed timestamp after the response is sent
+    background_tasks.add_task(_record_file_access, session_factory, file_id)
     
     return file
 
@@ -186,8 +275,11 @@ async def get_file(
 @router.get("/download/{file_id}")
 async def stream_file(
     file_id: int,
+    background_tasks: BackgroundTasks,
     inline: bool = True,
+    range_header: Optional[str] = Header(None, alias="Range"),
     db: Session = Depends(get_db),
+    session_factory: sessionmaker = Depends(get_session_factory),
     current_user: UserModel = Depends(get_current_user)
 ):
     file = db.query(FileModel).filter(FileModel.id == file_id).first()
@@ -200,44 +292,71 @@ async def stream_file(
     if not file.file_path or not os.path.exists(file.file_path):
         raise HTTPException(status_code=404, detail="File content missing")
 
-    file.last_accessed_at = datetime.utcnow()
-    db.commit()
+    background_tasks.add_task(_record_file_access, session_factory, file_id)
 
     disposition = 'inline' if inline else 'attachment'
+    media_type = file.mime_type or 'application/octet-stream'
     headers = {
-        "Content-Disposition": f"{disposition}; filename=\"{file.original_filename}\""
+        "Content-Disposition": f"{disposition}; filename=\"{file.original_filename}\"",
+        "Accept-Ranges": "bytes",
     }
 
+    # FileResponse in this Starlette version ignores Range, so partial
+    # requests (resumed or parallel downloads) are served here
+    if range_header:
+        file_size = os.path.getsize(file.file_path)
+        byte_range = _parse_byte_range(range_header, file_size)
+        if byte_range:
+            start, end = byte_range
+            headers["Content-Range"] = f"bytes {start}-{end}/{file_size}"
+            headers["Content-Length"] = str(end - start + 1)
+            return StreamingResponse(
+                _iter_file_range(file.file_path, start, end - start + 1),
+                status_code=status.HTTP_206_PARTIAL_CONTENT,
+                media_type=media_type,
+                headers=headers
+            )
+
     return FileResponse(
         path=file.file_path,
-        media_type=file.mime_type or 'application/octet-stream',
+        media_type=media_type,
         filename=file.original_filename,
         headers=headers
     )
 
 
+# Columns of the File response schema, selected without building ORM objects
+_FILE_COLUMNS = [getattr(FileModel, name) for name in File.model_fields]
+
+
 @router.get("/old-files/", response_model=List[File])
 async def get_old_files(
     days_threshold: int = 30,
+    skip: int = 0,
+    limit: int = 100,
     db: Session = Depends(get_db),
     current_user: UserModel = Depends(get_current_user)
 ):
     """Get files older than specified days threshold."""
     threshold_date = datetime.now() - timedelta(days=days_threshold)
     
-    files = db.query(FileModel).filter(
-        FileModel.uploaded_at < threshold_date
-    ).all()
+    rows = db.execute(
+        select(*_FILE_COLUMNS)
+        .where(FileModel.uploaded_at < threshold_date)
+        .order_by(FileModel.uploaded_at, FileModel.id)
+        .offset(skip)
+        .limit(limit)
+    )
     
-    return files
+    return [dict(row._mapping) for row in rows]
 
 
 @router.post("/upload", response_model=File, status_code=status.HTTP_201_CREATED)
 async def upload_file(
     task_id: int,
     file: UploadFile = FastAPIFile(...),
-    description: str = None,
-    file_date: str = None,
+    description: Optional[str] = Form(None),
+    file_date: Optional[date] = Form(None),
     db: Session = Depends(get_db),
     current_user: UserModel = Depends(get_current_user)
 ):
@@ -247,18 +366,6 @@ async def upload_file(
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
     
-    # Check file size
-    max_size_bytes = settings.max_file_size_mb * 1024 * 1024
-    file.file.seek(0, 2)  # Seek to end
-    file_size = file.file.tell()
-    file.file.seek(0)  # Reset to beginning
-    
-    if file_size > max_size_bytes:
-        raise HTTPException(
-            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
-            detail=f"File size exceeds maximum allowed size of {settings.max_file_size_mb}MB"
-        )
-    
     # Generate unique filename
     file_extension = os.path.splitext(file.filename)[1]
     unique_filename = f"{uuid.uuid4()}{file_extension}"
@@ -269,18 +376,8 @@ async def upload_file(
     
     file_path = os.path.join(task_dir, unique_filename)
     
-    # Save file
-    with open(file_path, "wb") as buffer:
-        content = await file.read()
-        buffer.write(content)
-    
-    # Parse file_date if provided
-    parsed_file_date = None
-    if file_date:
-        try:
-            parsed_file_date = datetime.fromisoformat(file_date).date()
-        except ValueError:
-            pass
+    # Save file, enforcing the size limit as it streams in
+    file_size = await _save_upload(file, file_path)
     
     # Create file record
     db_file = FileModel(
@@ -291,14 +388,14 @@ async def upload_file(
         file_size=file_size,
         mime_type=file.content_type,
         description=description,
-        file_date=parsed_file_date,
+        file_date=file_date,
         uploaded_by_id=current_user.id,
         is_external_link=False
     )
     
     db.add(db_file)
-    db.commit()
-    db.refresh(db_file)
+    # Flush for the file id; the file and its audit entry commit together
+    db.flush()
     
     # Log file upload
     audit_log = AuditLogModel(
@@ -311,6 +408,7 @@ async def upload_file(
     )
     db.add(audit_log)
     db.commit()
+    db.refresh(db_file)
     
     return db_file
 
@@ -319,8 +417,8 @@ async def upload_file(
 async def link_external_file(
     task_id: int,
     external_url: str,
-    description: str = None,
-    file_date: str = None,
+    description: Optional[str] = None,
+    file_date: Optional[date] = None,
     db: Session = Depends(get_db),
     current_user: UserModel = Depends(get_current_user)
 ):
@@ -330,14 +428,6 @@ async def link_external_file(
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
     
-    # Parse file_date if provided
-    parsed_file_date = None
-    if file_date:
-        try:
-            parsed_file_date = datetime.fromisoformat(file_date).date()
-        except ValueError:
-            pass
-    
     # Extract filename from URL
     filename = external_url.split("/")[-1] or "External Link"
     
@@ -349,15 +439,15 @@ async def link_external_file(
         file_path="",
         file_size=0,
         description=description,
-        file_date=parsed_file_date,
+        file_date=file_date,
         uploaded_by_id=current_user.id,
         is_external_link=True,
         external_url=external_url
     )
     
     db.add(db_file)
-    db.commit()
-    db.refresh(db_file)
+    # Flush for the file id; the file and its audit entry commit together
+    db.flush()
     
     # Log file link
     audit_log = AuditLogModel(
@@ -370,6 +460,7 @@ async def link_external_file(
     )
     db.add(audit_log)
     db.commit()
+    db.refresh(db_file)
     
     return db_file
 
@@ -443,8 +534,8 @@ async def get_prior_period_files(
 async def upload_period_file(
     period_id: int,
     file: UploadFile = FastAPIFile(...),
-    description: str = None,
-    file_date: str = None,
+    description: Optional[str] = Form(None),
+    file_date: Optional[date] = Form(None),
     db: Session = Depends(get_db),
     current_user: UserModel = Depends(get_current_user)
 ):
@@ -454,18 +545,6 @@ async def upload_period_file(
     if not period:
         raise HTTPException(status_code=404, detail="Period not found")
     
-    # Check file size
-    max_size_bytes = settings.max_file_size_mb * 1024 * 1024
-    file.file.seek(0, 2)  # Seek to end
-    file_size = file.file.tell()
-    file.file.seek(0)  # Reset to beginning
-    
-    if file_size > max_size_bytes:
-        raise HTTPException(
-            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
-            detail=f"File size exceeds maximum allowed size of {settings.max_file_size_mb}MB"
-        )
-    
     # Generate unique filename
     file_extension = os.path.splitext(file.filename)[1]
     unique_filename = f"{uuid.uuid4()}{file_extension}"
@@ -477,18 +556,8 @@ async def upload_period_file(
     
     file_path = os.path.join(period_dir, unique_filename)
     
-    # Save file
-    with open(file_path, "wb") as buffer:
-        content = await file.read()
-        buffer.write(content)
-    
-    # Parse file_date if provided
-    parsed_file_date = None
-    if file_date:
-        try:
-            parsed_file_date = datetime.fromisoformat(file_date).date()
-        except ValueError:
-            pass
+    # Save file, enforcing the size limit as it streams in
+    file_size = await _save_upload(file, file_path)
     
     # Create file record
     db_file = FileModel(
@@ -500,14 +569,14 @@ async def upload_period_file(
         file_size=file_size,
         mime_type=file.content_type,
         description=description,
-        file_date=parsed_file_date,
+        file_date=file_date,
         uploaded_by_id=current_user.id,
         is_external_link=False
     )
     
     db.add(db_file)
-    db.commit()
-    db.refresh(db_file)
+    # Flush for the file id; the file and its audit entry commit together
+    db.flush()
     
     # Log file upload
     audit_log = AuditLogModel(
@@ -520,6 +589,7 @@ async def upload_period_file(
     )
     db.add(audit_log)
     db.commit()
+    db.refresh(db_file)
     
     return db_file
 
@@ -536,12 +606,9 @@ async def download_period_zip(
     if not period:
         raise HTTPException(status_code=404, detail="Period not found")
     
-    # Estimate size (optional, for logging/monitoring)
-    estimated_size = estimate_zip_size(db, period_id)
-    
-    # Create zip archive
+    # Collect the archive contents; the zip itself is built as it streams
     try:
-        zip_buffer = create_period_zip_archive(db, period_id)
+        zip_stream = create_period_zip_archive(db, period_id)
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -565,9 +632,11 @@ async def download_period_zip(
     
     # Return streaming response
     return StreamingResponse(
-        zip_buffer,
+        zip_stream,
         media_type="application/zip",
         headers={
-            "Content-Disposition": f"attachment; filename={zip_filename}"
+            "Content-Disposition": f"attachment; filename={zip_filename}",
+            # Built on the fly, so there is no stable byte range to resume from
+            "Accept-Ranges": "none",
         }
     )
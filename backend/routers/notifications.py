@@ -1,7 +1,7 @@
 from typing import List
-from datetime import datetime
 
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import func, select, update
 from sqlalchemy.orm import Session
 
 from backend.auth import get_current_user
@@ -48,20 +48,30 @@ async def mark_notification_read(
     db: Session = Depends(get_db),
     current_user: UserModel = Depends(get_current_user)
 ):
-    notification = (
-        db.query(NotificationModel)
-        .filter(NotificationModel.id == notification_id, NotificationModel.user_id == current_user.id)
-        .first()
-    )
-
-    if not notification:
-        raise HTTPException(status_code=404, detail="Notification not found")
-
-    if not notification.is_read:
-        notification.is_read = True
-        notification.read_at = datetime.utcnow()
+    # Flip the flag in a single UPDATE ... RETURNING; only unread rows match
+    notification = db.execute(
+        update(NotificationModel)
+        .where(
+            NotificationModel.id == notification_id,
+            NotificationModel.user_id == current_user.id,
+            NotificationModel.is_read.is_(False),
+        )
+        .values(is_read=True, read_at=func.now())
+        .returning(NotificationModel)
+    ).scalar()
+
+    if notification is None:
+        # Nothing updated: already read, or not this user's notification
+        notification = db.execute(
+            select(NotificationModel).where(
+                NotificationModel.id == notification_id,
+                NotificationModel.user_id == current_user.id,
+            )
+        ).scalar()
+        if notification is None:
+            raise HTTPException(status_code=404, detail="Notification not found")
+    else:
         db.commit()
-        db.refresh(notification)
 
     return notification
 
@@ -74,10 +84,13 @@ async def mark_all_notifications_read(
     updated = (
         db.query(NotificationModel)
         .filter(NotificationModel.user_id == current_user.id, NotificationModel.is_read.is_(False))
+        # "fetch" keeps notifications already loaded in this session in step;
+        # the matched ids come back via RETURNING where the database supports it
         .update({
             NotificationModel.is_read: True,
-            NotificationModel.read_at: datetime.utcnow(),
-        })
+            # Stamped by the database; no Python-side value to bind
+            NotificationModel.read_at: func.now(),
+        }, synchronize_session="fetch")
     )
     db.commit()
     return updated
@@ -3,8 +3,8 @@ from datetime import datetime, timedelta, timezone, date
 import calendar
 
 from fastapi import APIRouter, Depends, HTTPException, status, Body
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy import and_, func, insert, select
 
 from backend.database import get_db
 from backend.auth import get_current_user, require_role
@@ -19,7 +19,9 @@ from backend.models import (
     TrialBalance as TrialBalanceModel,
     TrialBalanceAccount as TrialBalanceAccountModel,
     TrialBalanceAttachment as TrialBalanceAttachmentModel,
+    task_dependencies,
 )
+from backend.services.period_cache import clear_period_id_cache, get_period_snapshot
 from backend.schemas import (
     Period,
     PeriodCreate,
@@ -35,15 +37,22 @@ from backend.schemas import (
 router = APIRouter(prefix="/api/periods", tags=["periods"])
 
 
-def _compute_due_datetime(period: PeriodModel, offset_days: int = 0) -> datetime:
+def _as_utc(dt: datetime) -> datetime:
+    """Treat naive datetimes (as SQLite returns them) as UTC."""
+    if dt.tzinfo is None:
+        return dt.replace(tzinfo=timezone.utc)
+    return dt
+
+
+def _base_due_datetime(period: PeriodModel) -> datetime:
+    """Midnight UTC on the period's target close date, or its last day."""
     if period.target_close_date:
         base_date: date = period.target_close_date
     else:
         last_day = calendar.monthrange(period.year, period.month)[1]
         base_date = date(period.year, period.month, last_day)
 
-    base_dt = datetime.combine(base_date, datetime.min.time()).replace(tzinfo=timezone.utc)
-    return base_dt + timedelta(days=offset_days)
+    return datetime.combine(base_date, datetime.min.time()).replace(tzinfo=timezone.utc)
 
 
 @router.get("/", response_model=List[Period])
@@ -76,7 +85,7 @@ async def get_period(
     current_user: UserModel = Depends(get_current_user)
 ):
     """Get a specific period by ID."""
-    period = db.query(PeriodModel).filter(PeriodModel.id == period_id).first()
+    period = get_period_snapshot(db, period_id)
     if not period:
         raise HTTPException(status_code=404, detail="Period not found")
     return period
@@ -94,26 +103,23 @@ async def get_period_summary(
     if not period:
         raise HTTPException(status_code=404, detail="Period not found")
 
-    tasks = db.query(TaskModel).filter(TaskModel.period_id == period_id).all()
-
-    total_tasks = len(tasks)
-    completed_tasks = sum(1 for task in tasks if task.status == TaskStatus.COMPLETE)
-
-    def ensure_aware(dt: Optional[datetime]) -> Optional[datetime]:
-        if dt is None:
-            return None
-        if dt.tzinfo is None:
-            return dt.replace(tzinfo=timezone.utc)
-        return dt.astimezone(timezone.utc)
-
+    # Counts aggregated in the database instead of loading every task
     now = datetime.now(timezone.utc)
-    overdue_tasks = sum(
-        1
-        for task in tasks
-        if task.status != TaskStatus.COMPLETE
-        and (due := ensure_aware(task.due_date))
-        and due < now
+    counts = (
+        db.query(
+            func.count(TaskModel.id).label("total"),
+            func.count(TaskModel.id).filter(TaskModel.status == TaskStatus.COMPLETE).label("completed"),
+            func.count(TaskModel.id).filter(
+                TaskModel.status != TaskStatus.COMPLETE,
+                TaskModel.due_date < now,
+            ).label("overdue"),
+        )
+        .filter(TaskModel.period_id == period_id)
+        .one()
     )
+    total_tasks = counts.total
+    completed_tasks = counts.completed
+    overdue_tasks = counts.overdue
 
     completion_percentage = (completed_tasks / total_tasks * 100) if total_tasks else 0.0
 
@@ -146,28 +152,39 @@ async def get_period_progress(
     if not period:
         raise HTTPException(status_code=404, detail="Period not found")
     
-    # Get task statistics
-    tasks = db.query(TaskModel).filter(TaskModel.period_id == period_id).all()
+    # Task counts per (status, department), aggregated in the database
+    is_overdue = and_(
+        TaskModel.due_date < datetime.now(timezone.utc),
+        TaskModel.status != TaskStatus.COMPLETE,
+    )
+    groups = (
+        db.query(
+            TaskModel.status,
+            TaskModel.department,
+            func.count(TaskModel.id).label("task_count"),
+            func.count(TaskModel.id).filter(is_overdue).label("overdue_count"),
+        )
+        .filter(TaskModel.period_id == period_id)
+        .group_by(TaskModel.status, TaskModel.department)
+        .all()
+    )
     
-    total_tasks = len(tasks)
-    completed_tasks = sum(1 for t in tasks if t.status == TaskStatus.COMPLETE)
-    in_progress_tasks = sum(1 for t in tasks if t.status == TaskStatus.IN_PROGRESS)
-    overdue_tasks = sum(1 for t in tasks if t.due_date and t.due_date < func.now() and t.status != TaskStatus.COMPLETE)
+    tasks_by_status = {task_status.value: 0 for task_status in TaskStatus}
+    tasks_by_department = {}
+    overdue_tasks = 0
+    for group in groups:
+        tasks_by_status[group.status.value] += group.task_count
+        dept = group.department or "Unassigned"
+        tasks_by_department[dept] = tasks_by_department.get(dept, 0) + group.task_count
+        overdue_tasks += group.overdue_count
+    
+    total_tasks = sum(tasks_by_status.values())
+    completed_tasks = tasks_by_status[TaskStatus.COMPLETE.value]
+    in_progress_tasks = tasks_by_status[TaskStatus.IN_PROGRESS.value]
     
     # Calculate completion percentage
     completion_percentage = (completed_tasks / total_tasks * 100) if total_tasks > 0 else 0
     
-    # Tasks by status
-    tasks_by_status = {}
-    for task_status in TaskStatus:
-        tasks_by_status[task_status.value] = sum(1 for t in tasks if t.status == task_status)
-    
-    # Tasks by department
-    tasks_by_department = {}
-    for task in tasks:
-        dept = task.department or "Unassigned"
-        tasks_by_department[dept] = tasks_by_department.get(dept, 0) + 1
-    
     stats = DashboardStats(
         total_tasks=total_tasks,
         completed_tasks=completed_tasks,
@@ -196,22 +213,31 @@ async def get_period_detail(
     if not period:
         raise HTTPException(status_code=404, detail="Period not found")
 
-    tasks = db.query(TaskModel).filter(TaskModel.period_id == period_id).all()
+    # Only the columns the response needs; no ORM objects per task
+    tasks = (
+        db.query(TaskModel.id, TaskModel.name, TaskModel.status, TaskModel.due_date, TaskModel.department)
+        .filter(TaskModel.period_id == period_id)
+        .all()
+    )
 
     total_tasks = len(tasks)
-    completed_tasks = sum(1 for task in tasks if task.status == TaskStatus.COMPLETE)
-    completion_percentage = (completed_tasks / total_tasks * 100) if total_tasks else 0.0
 
     status_counts: Dict[str, int] = {}
     tasks_by_status: Dict[str, List[TaskSummary]] = {}
     department_totals: Dict[str, Dict[str, int]] = {}
+    overdue_tasks: List[TaskSummary] = []
+    upcoming_tasks: List[TaskSummary] = []
+
+    now = datetime.now(timezone.utc)
+    upcoming_cutoff = now + timedelta(days=3)
 
     for task in tasks:
-        status_key = task.status.value if isinstance(task.status, TaskStatus) else str(task.status)
-        status_counts[status_key] = status_counts.get(status_key, 0) + 1
-        tasks_by_status.setdefault(status_key, []).append(
-            TaskSummary(id=task.id, name=task.name, status=task.status, due_date=task.due_date)
+        summary = TaskSummary.model_construct(
+            id=task.id, name=task.name, status=task.status, due_date=task.due_date
         )
+        status_key = task.status.value
+        status_counts[status_key] = status_counts.get(status_key, 0) + 1
+        tasks_by_status.setdefault(status_key, []).append(summary)
 
         department_key = task.department or 'Unassigned'
         if department_key not in department_totals:
@@ -219,20 +245,15 @@ async def get_period_detail(
         department_totals[department_key]["total"] += 1
         if task.status == TaskStatus.COMPLETE:
             department_totals[department_key]["completed"] += 1
-
-    now = datetime.utcnow()
-    upcoming_cutoff = now + timedelta(days=3)
-
-    overdue_tasks = [
-        TaskSummary(id=task.id, name=task.name, status=task.status, due_date=task.due_date)
-        for task in tasks
-        if task.status != TaskStatus.COMPLETE and task.due_date and task.due_date < now
-    ]
-    upcoming_tasks = [
-        TaskSummary(id=task.id, name=task.name, status=task.status, due_date=task.due_date)
-        for task in tasks
-        if task.status != TaskStatus.COMPLETE and task.due_date and now <= task.due_date <= upcoming_cutoff
-    ]
+        elif task.due_date:
+            due = _as_utc(task.due_date)
+            if due < now:
+                overdue_tasks.append(summary)
+            elif due <= upcoming_cutoff:
+                upcoming_tasks.append(summary)
+
+    completed_tasks = status_counts.get(TaskStatus.COMPLETE.value, 0)
+    completion_percentage = (completed_tasks / total_tasks * 100) if total_tasks else 0.0
 
     department_breakdown = [
         DepartmentSummary(
@@ -243,24 +264,23 @@ async def get_period_detail(
         for department, counts in department_totals.items()
     ]
 
-    period_files_count = (
-        db.query(FileModel)
-        .filter(FileModel.period_id == period_id, FileModel.task_id.is_(None))
-        .count()
-    )
-
-    task_files_count = (
-        db.query(FileModel)
-        .filter(FileModel.period_id == period_id, FileModel.task_id.isnot(None))
-        .count()
-    )
-
-    trial_balance_files_count = (
-        db.query(TrialBalanceAttachmentModel)
+    # All three file counts in one round trip: the file counts by conditional
+    # aggregation, the trial balance attachments as a scalar subquery
+    trial_balance_files = (
+        select(func.count(TrialBalanceAttachmentModel.id))
         .join(TrialBalanceAccountModel, TrialBalanceAttachmentModel.account_id == TrialBalanceAccountModel.id)
         .join(TrialBalanceModel, TrialBalanceAccountModel.trial_balance_id == TrialBalanceModel.id)
-        .filter(TrialBalanceModel.period_id == period_id)
-        .count()
+        .where(TrialBalanceModel.period_id == period_id)
+        .scalar_subquery()
+    )
+    file_counts = (
+        db.query(
+            func.count(FileModel.id).filter(FileModel.task_id.is_(None)).label("period_files"),
+            func.count(FileModel.id).filter(FileModel.task_id.isnot(None)).label("task_files"),
+            trial_balance_files.label("trial_balance_files"),
+        )
+        .filter(FileModel.period_id == period_id)
+        .one()
     )
 
     return PeriodDetail(
@@ -272,9 +292,9 @@ async def get_period_detail(
         overdue_tasks=overdue_tasks,
         upcoming_tasks=upcoming_tasks,
         department_breakdown=department_breakdown,
-        period_files_count=period_files_count,
-        task_files_count=task_files_count,
-        trial_balance_files_count=trial_balance_files_count,
+        period_files_count=file_counts.period_files,
+        task_files_count=file_counts.task_files,
+        trial_balance_files_count=file_counts.trial_balance_files,
     )
 
 
@@ -302,45 +322,55 @@ async def create_period(
     db_period = PeriodModel(**period_data.model_dump())
     db.add(db_period)
     db.commit()
+    clear_period_id_cache()
     db.refresh(db_period)
     
     # Roll forward tasks from templates if requested
     if roll_forward_tasks:
-        templates = db.query(TaskTemplateModel).filter(
+        templates = db.query(TaskTemplateModel).options(
+            selectinload(TaskTemplateModel.dependencies)
+        ).filter(
             TaskTemplateModel.close_type == period_data.close_type,
             TaskTemplateModel.is_active == True
         ).all()
         
-        # First pass: Create all tasks and build template->task mapping
-        template_to_task_map = {}
-        for template in templates:
-            due_date = _compute_due_datetime(db_period, template.days_offset or 0)
-            task = TaskModel(
-                period_id=db_period.id,
-                template_id=template.id,
-                name=template.name,
-                description=template.description,
-                owner_id=template.default_owner_id or current_user.id,
-                department=template.department,
-                estimated_hours=template.estimated_hours,
-                is_recurring=True,
-                due_date=due_date,
-                position_x=template.position_x,
-                position_y=template.position_y
+        # Insert every task in one executemany; RETURNING maps each template
+        # to its new task id
+        base_due = _base_due_datetime(db_period)
+        task_rows = [
+            {
+                "period_id": db_period.id,
+                "template_id": template.id,
+                "name": template.name,
+                "description": template.description,
+                "owner_id": template.default_owner_id or current_user.id,
+                "department": template.department,
+                "estimated_hours": template.estimated_hours,
+                "is_recurring": True,
+                "due_date": base_due + timedelta(days=template.days_offset or 0),
+                "position_x": template.position_x,
+                "position_y": template.position_y,
+            }
+            for template in templates
+        ]
+        template_to_task_id = {}
+        if task_rows:
+            template_to_task_id = dict(
+                db.execute(
+                    insert(TaskModel).returning(TaskModel.template_id, TaskModel.id),
+                    task_rows,
+                ).all()
             )
-            db.add(task)
-            db.flush()  # Flush to get task ID
-            template_to_task_map[template.id] = task
         
-        # Second pass: Apply template dependencies to tasks
-        for template in templates:
-            if template.dependencies:
-                task = template_to_task_map.get(template.id)
-                if task:
-                    for dep_template in template.dependencies:
-                        dep_task = template_to_task_map.get(dep_template.id)
-                        if dep_task:
-                            task.dependencies.append(dep_task)
+        # Apply template dependencies to the new tasks in one executemany
+        dependency_rows = [
+            {"task_id": template_to_task_id[template.id], "depends_on_id": template_to_task_id[dep_template.id]}
+            for template in templates
+            for dep_template in template.dependencies
+            if dep_template.id in template_to_task_id
+        ]
+        if dependency_rows:
+            db.execute(insert(task_dependencies), dependency_rows)
         
         db.commit()
     
@@ -364,6 +394,7 @@ async def update_period(
         setattr(period, field, value)
     
     db.commit()
+    clear_period_id_cache()
     db.refresh(period)
     return period
 
@@ -381,6 +412,7 @@ async def set_period_activation(
 
     period.is_active = is_active
     db.commit()
+    clear_period_id_cache()
     db.refresh(period)
 
     return period
@@ -399,5 +431,6 @@ async def delete_period(
     
     db.delete(period)
     db.commit()
+    clear_period_id_cache()
     return None
 
@@ -1,8 +1,9 @@
-from typing import List
+from typing import Iterator, List, Optional
 from fastapi import APIRouter, Depends, Response
-from sqlalchemy.orm import Session
-from sqlalchemy import func
-from datetime import datetime, timedelta
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session, joinedload, raiseload, sessionmaker
+from sqlalchemy import Integer, and_, case, cast, func, literal_column, select
+from datetime import datetime, timedelta, timezone
 import csv
 import io
 from reportlab.lib import colors
@@ -10,18 +11,40 @@ from reportlab.lib.pagesizes import letter, landscape
 from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
 from reportlab.lib.styles import getSampleStyleSheet
 
-from backend.database import get_db
+from backend.database import get_db, get_session_factory
 from backend.auth import get_current_user
 from backend.models import (
     Task as TaskModel,
     Period as PeriodModel,
     User as UserModel,
+    File as FileModel,
+    Approval as ApprovalModel,
     TaskStatus
 )
 from backend.schemas import TaskReport, PeriodMetrics
 
 router = APIRouter(prefix="/api/reports", tags=["reports"])
 
+# Names shown in task reports and exports, loaded with each task row rather
+# than one lazy load per task
+_TASK_NAME_LOADS = (
+    joinedload(TaskModel.period),
+    joinedload(TaskModel.owner),
+    joinedload(TaskModel.assignee),
+    raiseload("*"),
+)
+
+
+def _completion_days(db: Session):
+    """Whole days from started_at to completed_at, as timedelta.days counts them."""
+    if db.get_bind().dialect.name == "postgresql":
+        return func.floor(func.extract("epoch", TaskModel.completed_at - TaskModel.started_at) / 86400)
+    # SQLite stores datetimes as text; julianday turns them into fractional days
+    days = func.julianday(TaskModel.completed_at) - func.julianday(TaskModel.started_at)
+    truncated = cast(days, Integer)
+    # CAST truncates toward zero; step negative fractions down to floor them
+    return truncated - case((days < truncated, 1), else_=0)
+
 
 @router.get("/tasks", response_model=List[TaskReport])
 async def get_task_report(
@@ -33,7 +56,20 @@ async def get_task_report(
     current_user: UserModel = Depends(get_current_user)
 ):
     """Get detailed task report."""
-    query = db.query(TaskModel)
+    # File and approval counts come back with each task row
+    file_count = (
+        select(func.count(FileModel.id))
+        .where(FileModel.task_id == TaskModel.id)
+        .correlate(TaskModel)
+        .scalar_subquery()
+    )
+    approval_count = (
+        select(func.count(ApprovalModel.id))
+        .where(ApprovalModel.task_id == TaskModel.id)
+        .correlate(TaskModel)
+        .scalar_subquery()
+    )
+    query = db.query(TaskModel, file_count, approval_count).options(*_TASK_NAME_LOADS)
     
     if period_id:
         query = query.filter(TaskModel.period_id == period_id)
@@ -49,10 +85,10 @@ async def get_task_report(
     if department:
         query = query.filter(TaskModel.department == department)
     
-    tasks = query.all()
+    rows = query.all()
     
     report = []
-    for task in tasks:
+    for task, task_file_count, task_approval_count in rows:
         days_to_complete = None
         if task.started_at and task.completed_at:
             days_to_complete = (task.completed_at - task.started_at).days
@@ -67,8 +103,8 @@ async def get_task_report(
             due_date=task.due_date,
             completed_at=task.completed_at,
             days_to_complete=days_to_complete,
-            file_count=len(task.files),
-            approval_count=len(task.approvals),
+            file_count=task_file_count,
+            approval_count=task_approval_count,
             department=task.department
         ))
     
@@ -83,100 +119,118 @@ async def get_period_metrics(
     current_user: UserModel = Depends(get_current_user)
 ):
     """Get metrics for all periods."""
-    query = db.query(PeriodModel)
+    # Task totals and completion times for every period in one grouped query
+    timed = and_(
+        TaskModel.status == TaskStatus.COMPLETE,
+        TaskModel.started_at.isnot(None),
+        TaskModel.completed_at.isnot(None),
+    )
+    query = (
+        db.query(
+            PeriodModel.id,
+            PeriodModel.name,
+            PeriodModel.target_close_date,
+            PeriodModel.actual_close_date,
+            func.count(TaskModel.id).label("total_tasks"),
+            func.count(TaskModel.id).filter(TaskModel.status == TaskStatus.COMPLETE).label("completed_tasks"),
+            func.avg(_completion_days(db)).filter(timed).label("avg_completion_days"),
+        )
+        .outerjoin(TaskModel, TaskModel.period_id == PeriodModel.id)
+        .group_by(PeriodModel.id)
+    )
     
     if year:
         query = query.filter(PeriodModel.year == year)
     
-    periods = query.order_by(PeriodModel.year.desc(), PeriodModel.month.desc()).all()
+    rows = query.order_by(PeriodModel.year.desc(), PeriodModel.month.desc()).all()
     
     metrics = []
-    for period in periods:
-        tasks = db.query(TaskModel).filter(TaskModel.period_id == period.id).all()
-        
-        total_tasks = len(tasks)
-        completed_tasks = sum(1 for t in tasks if t.status == TaskStatus.COMPLETE)
-        completion_rate = (completed_tasks / total_tasks * 100) if total_tasks > 0 else 0
+    for row in rows:
+        completion_rate = (row.completed_tasks / row.total_tasks * 100) if row.total_tasks > 0 else 0
         
         # Calculate days to close
         days_to_close = None
-        if period.actual_close_date and period.target_close_date:
-            days_to_close = (period.actual_close_date - period.target_close_date).days
-        
-        # Calculate average task completion time
-        completed_with_times = [
-            t for t in tasks 
-            if t.status == TaskStatus.COMPLETE and t.started_at and t.completed_at
-        ]
+        if row.actual_close_date and row.target_close_date:
+            days_to_close = (row.actual_close_date - row.target_close_date).days
         
-        avg_completion_days = None
-        if completed_with_times:
-            total_days = sum(
-                (t.completed_at - t.started_at).days 
-                for t in completed_with_times
-            )
-            avg_completion_days = total_days / len(completed_with_times)
+        avg_completion_days = row.avg_completion_days
         
         metrics.append(PeriodMetrics(
-            period_id=period.id,
-            period_name=period.name,
-            target_close_date=period.target_close_date,
-            actual_close_date=period.actual_close_date,
+            period_id=row.id,
+            period_name=row.name,
+            target_close_date=row.target_close_date,
+            actual_close_date=row.actual_close_date,
             days_to_close=days_to_close,
-            total_tasks=total_tasks,
-            completed_tasks=completed_tasks,
+            total_tasks=row.total_tasks,
+            completed_tasks=row.completed_tasks,
             completion_rate=round(completion_rate, 2),
-            avg_task_completion_days=round(avg_completion_days, 2) if avg_completion_days else None
+            avg_task_completion_days=round(float(avg_completion_days), 2) if avg_completion_days else None
         ))
     
     return metrics
 
 
+CSV_EXPORT_BATCH_SIZE = 1000
+
+CSV_EXPORT_HEADER = [
+    "Task ID", "Task Name", "Period", "Owner", "Assignee", 
+    "Status", "Department", "Due Date", "Completed At", 
+    "Priority", "Estimated Hours", "Actual Hours"
+]
+
+
+def _iter_tasks_csv(session_factory: sessionmaker, period_id: Optional[int]) -> Iterator[str]:
+    """Yield the task export as CSV text, one batch of rows at a time.
+
+    The body streams after the request's session has closed, so this reads
+    through its own session. Tasks are fetched CSV_EXPORT_BATCH_SIZE at a
+    time, so neither the rows nor the CSV text are held in memory in full.
+    """
+    output = io.StringIO()
+    writer = csv.writer(output)
+    writer.writerow(CSV_EXPORT_HEADER)
+    
+    db = session_factory()
+    try:
+        query = db.query(TaskModel).options(*_TASK_NAME_LOADS)
+        if period_id:
+            query = query.filter(TaskModel.period_id == period_id)
+        
+        for index, task in enumerate(query.yield_per(CSV_EXPORT_BATCH_SIZE), start=1):
+            writer.writerow([
+                task.id,
+                task.name,
+                task.period.name if task.period else "N/A",
+                task.owner.name if task.owner else "N/A",
+                task.assignee.name if task.assignee else "",
+                task.status.value,
+                task.department or "",
+                task.due_date.isoformat() if task.due_date else "",
+                task.completed_at.isoformat() if task.completed_at else "",
+                task.priority,
+                task.estimated_hours or "",
+                task.actual_hours or ""
+            ])
+            if index % CSV_EXPORT_BATCH_SIZE == 0:
+                yield output.getvalue()
+                output.seek(0)
+                output.truncate()
+    finally:
+        db.close()
+    
+    if output.tell():
+        yield output.getvalue()
+
+
 @router.get("/tasks/export/csv")
 async def export_tasks_csv(
     period_id: int = None,
-    db: Session = Depends(get_db),
+    session_factory: sessionmaker = Depends(get_session_factory),
     current_user: UserModel = Depends(get_current_user)
 ):
     """Export tasks to CSV."""
-    query = db.query(TaskModel)
-    
-    if period_id:
-        query = query.filter(TaskModel.period_id == period_id)
-    
-    tasks = query.all()
-    
-    # Create CSV
-    output = io.StringIO()
-    writer = csv.writer(output)
-    
-    # Write header
-    writer.writerow([
-        "Task ID", "Task Name", "Period", "Owner", "Assignee", 
-        "Status", "Department", "Due Date", "Completed At", 
-        "Priority", "Estimated Hours", "Actual Hours"
-    ])
-    
-    # Write data
-    for task in tasks:
-        writer.writerow([
-            task.id,
-            task.name,
-            task.period.name if task.period else "N/A",
-            task.owner.name if task.owner else "N/A",
-            task.assignee.name if task.assignee else "",
-            task.status.value,
-            task.department or "",
-            task.due_date.isoformat() if task.due_date else "",
-            task.completed_at.isoformat() if task.completed_at else "",
-            task.priority,
-            task.estimated_hours or "",
-            task.actual_hours or ""
-        ])
-    
-    # Return CSV
-    return Response(
-        content=output.getvalue(),
+    return StreamingResponse(
+        _iter_tasks_csv(session_factory, period_id),
         media_type="text/csv",
         headers={
             "Content-Disposition": f"attachment; filename=tasks_export_{datetime.now().strftime('%Y%m%d')}.csv"
@@ -191,12 +245,13 @@ async def export_tasks_pdf(
     current_user: UserModel = Depends(get_current_user)
 ):
     """Export tasks to PDF."""
-    query = db.query(TaskModel)
+    query = db.query(TaskModel).options(joinedload(TaskModel.owner), raiseload("*"))
     
     if period_id:
         query = query.filter(TaskModel.period_id == period_id)
     
-    tasks = query.all()
+    # The PDF lists at most 50 tasks, so fetch no more than that
+    tasks = query.limit(50).all()
     
     # Create PDF
     buffer = io.BytesIO()
@@ -212,7 +267,7 @@ async def export_tasks_pdf(
     # Create table data
     data = [["ID", "Task Name", "Owner", "Status", "Due Date", "Priority"]]
     
-    for task in tasks[:50]:  # Limit to first 50 for PDF
+    for task in tasks:
         data.append([
             str(task.id),
             task.name[:40],  # Truncate long names
@@ -258,60 +313,45 @@ async def get_workload_report(
     current_user: UserModel = Depends(get_current_user)
 ):
     """Get workload report by user."""
-    # Get all users who have tasks
-    query = db.query(TaskModel)
+    # Per-assignee counts and hours, aggregated in the database
+    query = (
+        db.query(
+            UserModel.id.label("user_id"),
+            UserModel.name.label("user_name"),
+            func.count(TaskModel.id).label("assigned_tasks"),
+            func.count(TaskModel.id).filter(TaskModel.status == TaskStatus.COMPLETE).label("completed_tasks"),
+            func.count(TaskModel.id).filter(TaskModel.status == TaskStatus.IN_PROGRESS).label("in_progress_tasks"),
+            func.coalesce(func.sum(TaskModel.estimated_hours), 0).label("estimated_hours"),
+            func.coalesce(func.sum(TaskModel.actual_hours), 0).label("actual_hours"),
+        )
+        .select_from(TaskModel)
+        .join(UserModel, UserModel.id == TaskModel.assignee_id)
+        .group_by(UserModel.id)
+    )
     if period_id:
         query = query.filter(TaskModel.period_id == period_id)
     
-    tasks = query.all()
-    
-    # Group tasks by assignee
-    workload_map = {}
-    
-    for task in tasks:
-        if not task.assignee:
-            continue
-        
-        assignee_id = task.assignee.id
-        assignee_name = task.assignee.name
-        
-        if assignee_id not in workload_map:
-            workload_map[assignee_id] = {
-                "user_id": assignee_id,
-                "user_name": assignee_name,
-                "assigned_tasks": 0,
-                "completed_tasks": 0,
-                "in_progress_tasks": 0,
-                "estimated_hours": 0.0,
-                "actual_hours": 0.0,
-            }
-        
-        workload_map[assignee_id]["assigned_tasks"] += 1
-        
-        if task.status == TaskStatus.COMPLETE:
-            workload_map[assignee_id]["completed_tasks"] += 1
-        elif task.status == TaskStatus.IN_PROGRESS:
-            workload_map[assignee_id]["in_progress_tasks"] += 1
-        
-        if task.estimated_hours:
-            workload_map[assignee_id]["estimated_hours"] += task.estimated_hours
-        
-        if task.actual_hours:
-            workload_map[assignee_id]["actual_hours"] += task.actual_hours
+    # Sort by assigned tasks descending
+    rows = query.order_by(func.count(TaskModel.id).desc(), UserModel.id).all()
     
     # Calculate completion rates
     result = []
-    for data in workload_map.values():
+    for row in rows:
         completion_rate = (
-            (data["completed_tasks"] / data["assigned_tasks"] * 100)
-            if data["assigned_tasks"] > 0
+            (row.completed_tasks / row.assigned_tasks * 100)
+            if row.assigned_tasks > 0
             else 0
         )
-        data["completion_rate"] = round(completion_rate, 2)
-        result.append(data)
-    
-    # Sort by assigned tasks descending
-    result.sort(key=lambda x: x["assigned_tasks"], reverse=True)
+        result.append({
+            "user_id": row.user_id,
+            "user_name": row.user_name,
+            "assigned_tasks": row.assigned_tasks,
+            "completed_tasks": row.completed_tasks,
+            "in_progress_tasks": row.in_progress_tasks,
+            "estimated_hours": float(row.estimated_hours),
+            "actual_hours": float(row.actual_hours),
+            "completion_rate": round(completion_rate, 2),
+        })
     
     return result
 
@@ -323,60 +363,42 @@ async def get_distribution_report(
     current_user: UserModel = Depends(get_current_user)
 ):
     """Get task distribution by department."""
-    query = db.query(TaskModel)
+    # Per-department counts and completion times, aggregated in the database
+    # Inlined rather than bound, so GROUP BY and SELECT are the same expression
+    department = func.coalesce(func.nullif(TaskModel.department, ""), literal_column("'Unassigned'")).label("department")
+    timed = and_(
+        TaskModel.status == TaskStatus.COMPLETE,
+        TaskModel.started_at.isnot(None),
+        TaskModel.completed_at.isnot(None),
+    )
+    query = (
+        db.query(
+            department,
+            func.count(TaskModel.id).label("total_tasks"),
+            func.count(TaskModel.id).filter(TaskModel.status == TaskStatus.COMPLETE).label("completed_tasks"),
+            # due_date is timezone-aware, so compare against UTC as the
+            # dashboard does rather than the server's naive local time
+            func.count(TaskModel.id).filter(
+                TaskModel.status != TaskStatus.COMPLETE,
+                TaskModel.due_date < datetime.now(timezone.utc),
+            ).label("overdue_tasks"),
+            func.avg(_completion_days(db)).filter(timed).label("avg_completion_days"),
+        )
+        .group_by(department)
+    )
     if period_id:
         query = query.filter(TaskModel.period_id == period_id)
     
-    tasks = query.all()
-    
-    # Group tasks by department
-    dept_map = {}
-    
-    for task in tasks:
-        dept = task.department or "Unassigned"
-        
-        if dept not in dept_map:
-            dept_map[dept] = {
-                "department": dept,
-                "total_tasks": 0,
-                "completed_tasks": 0,
-                "overdue_tasks": 0,
-                "completion_days": [],
-            }
-        
-        dept_map[dept]["total_tasks"] += 1
-        
-        if task.status == TaskStatus.COMPLETE:
-            dept_map[dept]["completed_tasks"] += 1
-            
-            # Calculate completion time if available
-            if task.started_at and task.completed_at:
-                days = (task.completed_at - task.started_at).days
-                dept_map[dept]["completion_days"].append(days)
-        
-        # Check if overdue
-        if task.due_date and task.status != TaskStatus.COMPLETE:
-            if task.due_date < datetime.now():
-                dept_map[dept]["overdue_tasks"] += 1
-    
-    # Calculate averages
-    result = []
-    for data in dept_map.values():
-        avg_completion_days = (
-            sum(data["completion_days"]) / len(data["completion_days"])
-            if data["completion_days"]
-            else None
-        )
-        
-        result.append({
-            "department": data["department"],
-            "total_tasks": data["total_tasks"],
-            "completed_tasks": data["completed_tasks"],
-            "overdue_tasks": data["overdue_tasks"],
-            "avg_completion_days": round(avg_completion_days, 2) if avg_completion_days else None,
-        })
-    
     # Sort by total tasks descending
-    result.sort(key=lambda x: x["total_tasks"], reverse=True)
-    
-    return result
+    rows = query.order_by(func.count(TaskModel.id).desc(), department).all()
+    
+    return [
+        {
+            "department": row.department,
+            "total_tasks": row.total_tasks,
+            "completed_tasks": row.completed_tasks,
+            "overdue_tasks": row.overdue_tasks,
+            "avg_completion_days": round(float(row.avg_completion_days), 2) if row.avg_completion_days else None,
+        }
+        for row in rows
+    ]
@@ -650,7 +650,7 @@ async def bulk_update_tasks(
             if payload.status == TaskStatus.COMPLETE and not task.completed_at:
                 task.completed_at = now
 
-            log_task_change(db, task, current_user, "status_changed", str(old_status), str(payload.status))
+            log_task_change(db, task, current_user, "status_changed", old_status.value, payload.status.value)
 
             if payload.status == TaskStatus.REVIEW and task.owner_id and task.owner_id != current_user.id:
                 NotificationService.create_notification(
@@ -699,6 +699,9 @@ async def update_task(
         raise HTTPException(status_code=404, detail="Task not found")
     
     update_data = task_update.model_dump(exclude_unset=True, exclude={"dependency_ids"})
+    # Status is NOT NULL; an explicit null leaves it unchanged
+    if "status" in update_data and update_data["status"] is None:
+        del update_data["status"]
     previous_assignee = task.assignee_id
     
     # Track status changes
@@ -710,7 +713,11 @@ async def update_task(
         
         # Log significant changes
         if field == "status" and old_value != value:
-            log_task_change(db, task, current_user, "status_changed", str(old_value), str(value))
+            log_task_change(
+                db, task, current_user, "status_changed",
+                old_value.value if old_value is not None else None,
+                value.value if value is not None else None,
+            )
             
             # Update timestamps based on status
             if value == TaskStatus.IN_PROGRESS and not task.started_at:
@@ -18,6 +18,7 @@ from fastapi import (
     Form
 )
 from fastapi.responses import FileResponse
+from sqlalchemy import exists
 from sqlalchemy.orm import Session, selectinload
 
 from backend.auth import get_current_user
@@ -31,6 +32,7 @@ from backend.models import (
     Period as PeriodModel,
     Task as TaskModel,
     TaskTemplate as TaskTemplateModel,
+    TaskTemplateAccount as TaskTemplateAccountModel,
     User as UserModel,
     File as FileModel,
     Approval as ApprovalModel,
@@ -1293,56 +1295,40 @@ async def get_missing_task_suggestions(
     
     period_id = trial_balance.period_id
     
-    # Get all accounts in this trial balance
-    accounts = db.query(TrialBalanceAccountModel).filter(
-        TrialBalanceAccountModel.trial_balance_id == trial_balance_id
-    ).all()
-    
-    account_map = {acc.account_number: acc for acc in accounts}
+    # A task already covers a template/account pair in this period
+    existing_task = exists().where(
+        TaskModel.id == trial_balance_account_tasks.c.task_id,
+        TaskModel.period_id == period_id,
+        TaskModel.template_id == TaskTemplateModel.id,
+        trial_balance_account_tasks.c.account_id == TrialBalanceAccountModel.id,
+    )
     
-    # Get all active templates
-    templates = db.query(TaskTemplateModel).filter(
+    # Match active templates to this trial balance's accounts through the
+    # indexed task_template_accounts table, keeping only uncovered pairs
+    rows = db.query(TaskTemplateModel, TrialBalanceAccountModel).join(
+        TaskTemplateAccountModel,
+        TaskTemplateAccountModel.template_id == TaskTemplateModel.id
+    ).join(
+        TrialBalanceAccountModel,
+        TrialBalanceAccountModel.account_number == TaskTemplateAccountModel.account_number
+    ).filter(
+        TrialBalanceAccountModel.trial_balance_id == trial_balance_id,
         TaskTemplateModel.is_active == True,
-        TaskTemplateModel.default_account_numbers.isnot(None)
-    ).all()
+        ~existing_task
+    ).order_by(TaskTemplateModel.id, TrialBalanceAccountModel.account_number).all()
     
-    suggestions = []
-    
-    for template in templates:
-        if not template.default_account_numbers:
-            continue
-        
-        # For each account number in template's default list
-        for account_number in template.default_account_numbers:
-            account_number_clean = str(account_number).strip()
-            
-            # Check if this account exists in trial balance
-            if account_number_clean not in account_map:
-                continue
-            
-            account = account_map[account_number_clean]
-            
-            # Check if a task already exists for this template + account in this period
-            existing_task = db.query(TaskModel).join(
-                trial_balance_account_tasks,
-                TaskModel.id == trial_balance_account_tasks.c.task_id
-            ).filter(
-                TaskModel.period_id == period_id,
-                TaskModel.template_id == template.id,
-                trial_balance_account_tasks.c.account_id == account.id
-            ).first()
-            
-            if not existing_task:
-                # This is a missing task - template exists, account exists, but no task
-                suggestions.append(MissingTaskSuggestion(
-                    template_id=template.id,
-                    template_name=template.name,
-                    account_id=account.id,
-                    account_number=account.account_number,
-                    account_name=account.account_name,
-                    department=template.department,
-                    estimated_hours=template.estimated_hours,
-                    default_owner_id=template.default_owner_id
-                ))
+    suggestions = [
+        MissingTaskSuggestion(
+            template_id=template.id,
+            template_name=template.name,
+            account_id=account.id,
+            account_number=account.account_number,
+            account_name=account.account_name,
+            department=template.department,
+            estimated_hours=template.estimated_hours,
+            default_owner_id=template.default_owner_id
+        )
+        for template, account in rows
+    ]
     
     return suggestions
@@ -168,6 +168,8 @@ class Task(TaskBase):
     completed_at: Optional[datetime] = None
     actual_hours: Optional[float] = None
     is_recurring: bool
+    latest_approval_status: Optional[ApprovalStatus] = None
+    latest_approval_at: Optional[datetime] = None
     created_at: datetime
     updated_at: Optional[datetime] = None
     
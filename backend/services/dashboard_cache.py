@@ -0,0 +1,183 @@
+import asyncio
+import logging
+import random
+from typing import Optional, Set, Tuple
+
+import redis
+import redis.asyncio as aioredis
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from backend.config import settings
+from backend.models import Task, Period
+
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "dashboard:stats"
+# Redis calls must never hold up a request for long when Redis is unhealthy
+SOCKET_TIMEOUT_SECONDS = 0.25
+
+_async_client: Optional[aioredis.Redis] = None
+_sync_client: Optional[redis.Redis] = None
+# Strong references to in-flight invalidations so they aren't garbage collected
+_pending_invalidations: Set["asyncio.Task[None]"] = set()
+
+
+def _enabled() -> bool:
+    return settings.dashboard_cache_ttl > 0
+
+
+def _get_async_client() -> aioredis.Redis:
+    global _async_client
+    if _async_client is None:
+        _async_client = aioredis.from_url(
+            settings.redis_url,
+            socket_connect_timeout=SOCKET_TIMEOUT_SECONDS,
+            socket_timeout=SOCKET_TIMEOUT_SECONDS,
+        )
+    return _async_client
+
+
+def _get_sync_client() -> redis.Redis:
+    global _sync_client
+    if _sync_client is None:
+        _sync_client = redis.Redis.from_url(
+            settings.redis_url,
+            socket_connect_timeout=SOCKET_TIMEOUT_SECONDS,
+            socket_timeout=SOCKET_TIMEOUT_SECONDS,
+        )
+    return _sync_client
+
+
+# Bumped on every relevant commit; fresh keys embed it, so one INCR retires
+# every fresh entry at once and they age out via their TTL
+EPOCH_KEY = f"{KEY_PREFIX}:epoch"
+
+
+def _fresh_key(scope: str, epoch: bytes) -> str:
+    return f"{KEY_PREFIX}:fresh:{epoch.decode()}:{scope}"
+
+
+def _stale_key(scope: str) -> str:
+    return f"{KEY_PREFIX}:stale:{scope}"
+
+
+class DashboardStatsCache:
+    """Cache-aside store for serialized dashboard stats.
+
+    Fresh entries expire after DASHBOARD_CACHE_TTL seconds (plus jitter so
+    entries written together don't expire together) and are keyed by the
+    current epoch, which invalidate() bumps. Callers read the epoch before
+    computing and store under it, so stats computed while a write commits
+    are never served as fresh. A stale copy without expiry is kept as a
+    fallback for when the database is unavailable.
+    Every method is a no-op when caching is disabled or Redis is unreachable.
+    """
+
+    @staticmethod
+    async def get(scope: str) -> Tuple[Optional[bytes], Optional[bytes]]:
+        """Return (fresh payload or None, current epoch) for a scope.
+
+        The epoch is None when caching is disabled or Redis is unreachable.
+        """
+        if not _enabled():
+            return None, None
+        try:
+            client = _get_async_client()
+            epoch = await client.get(EPOCH_KEY) or b"0"
+            return await client.get(_fresh_key(scope, epoch)), epoch
+        except redis.RedisError as e:
+            logger.warning("Dashboard cache read failed: %s", e)
+            return None, None
+
+    @staticmethod
+    async def get_stale(scope: str) -> Optional[bytes]:
+        """Return the last payload stored for a scope, however old."""
+        if not _enabled():
+            return None
+        try:
+            return await _get_async_client().get(_stale_key(scope))
+        except redis.RedisError as e:
+            logger.warning("Dashboard cache read failed: %s", e)
+            return None
+
+    @staticmethod
+    async def set(scope: str, epoch: Optional[bytes], payload: bytes) -> None:
+        """Store a payload computed after get() returned `epoch`."""
+        if not _enabled() or epoch is None:
+            return
+        ttl = settings.dashboard_cache_ttl + random.randint(1, 5)
+        try:
+            async with _get_async_client().pipeline(transaction=False) as pipe:
+                pipe.setex(_fresh_key(scope, epoch), ttl, payload)
+                pipe.set(_stale_key(scope), payload)
+                await pipe.execute()
+        except redis.RedisError as e:
+            logger.warning("Dashboard cache write failed: %s", e)
+
+    @staticmethod
+    def invalidate() -> None:
+        """Retire every fresh entry; stale fallbacks are kept.
+
+        Called from the after_commit hook. Inside an event loop (async route
+        handlers) the bump is scheduled on the async client so a slow Redis
+        never blocks the loop; sync handlers run in the threadpool and bump
+        directly.
+        """
+        if not _enabled():
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            try:
+                _get_sync_client().incr(EPOCH_KEY)
+            except redis.RedisError as e:
+                logger.warning("Dashboard cache invalidation failed: %s", e)
+            return
+        task = loop.create_task(DashboardStatsCache._invalidate_async())
+        _pending_invalidations.add(task)
+        task.add_done_callback(_pending_invalidations.discard)
+
+    @staticmethod
+    async def _invalidate_async() -> None:
+        try:
+            await _get_async_client().incr(EPOCH_KEY)
+        except redis.RedisError as e:
+            logger.warning("Dashboard cache invalidation failed: %s", e)
+
+
+# Invalidate after any commit that changed tasks or periods, whichever
+# router made the change
+_STATS_MODELS = (Task, Period)
+
+
+@event.listens_for(Session, "after_flush")
+def _mark_dashboard_stale(session, flush_context):
+    if not _enabled():
+        return
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, _STATS_MODELS):
+            session.info["dashboard_stale"] = True
+            return
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _mark_dashboard_stale_bulk(orm_execute_state):
+    if not _enabled():
+        return
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        mapper = orm_execute_state.bind_mapper
+        if mapper is not None and issubclass(mapper.class_, _STATS_MODELS):
+            orm_execute_state.session.info["dashboard_stale"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_dashboard_cache(session):
+    if session.info.pop("dashboard_stale", False):
+        DashboardStatsCache.invalidate()
+
+
+@event.listens_for(Session, "after_rollback")
+def _clear_dashboard_stale(session):
+    session.info.pop("dashboard_stale", None)
@@ -1,10 +1,10 @@
 """
 File archiver service for creating zip archives of period files.
 """
+import io
 import os
 import zipfile
-from io import BytesIO
-from typing import List, Dict, Any
+from typing import Dict, Iterator, List, Tuple
 from sqlalchemy.orm import Session
 
 from backend.models import (
@@ -17,6 +17,12 @@ from backend.models import (
 )
 
 
+ZIP_CHUNK_SIZE = 1024 * 1024
+# Entries larger than this need zip64 headers, which must be requested up
+# front when streaming
+ZIP64_THRESHOLD = (1 << 31) - 1
+
+
 def sanitize_filename(name: str) -> str:
     """Sanitize a filename for safe use in zip archives."""
     # Replace invalid characters with underscores
@@ -26,165 +32,163 @@ def sanitize_filename(name: str) -> str:
     return name
 
 
-def create_period_zip_archive(db: Session, period_id: int) -> BytesIO:
+class _ZipStream(io.RawIOBase):
+    """Unseekable sink that hands back whatever zipfile has written so far."""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _stream_zip(entries: List[Tuple[str, str]]) -> Iterator[bytes]:
+    """Yield a zip archive of (source path, archive path) entries as it is built.
+
+    Each file is read and compressed in chunks, so memory stays flat however
+    large the archive grows.
+    """
+    stream = _ZipStream()
+    with zipfile.ZipFile(stream, 'w', zipfile.ZIP_DEFLATED) as zip_file:
+        for source_path, zip_path in entries:
+            zip_info = zipfile.ZipInfo.from_file(source_path, zip_path)
+            zip_info.compress_type = zipfile.ZIP_DEFLATED
+            force_zip64 = zip_info.file_size > ZIP64_THRESHOLD
+            with open(source_path, 'rb') as source, zip_file.open(zip_info, 'w', force_zip64=force_zip64) as dest:
+                while chunk := source.read(ZIP_CHUNK_SIZE):
+                    dest.write(chunk)
+                    yield stream.drain()
+            yield stream.drain()
+    # Central directory
+    yield stream.drain()
+
+
+def create_period_zip_archive(db: Session, period_id: int) -> Iterator[bytes]:
     """
     Create a zip archive containing all files for a period.
     
-    Returns a BytesIO object containing the zip file.
+    The database is read up front; the returned iterator then yields the zip
+    bytes as each file is compressed, so it can be streamed to the client
+    after the request's session has closed.
     """
     # Get period
     period = db.query(PeriodModel).filter(PeriodModel.id == period_id).first()
     if not period:
         raise ValueError(f"Period {period_id} not found")
     
-    # Create in-memory zip file
-    zip_buffer = BytesIO()
+    # (source path, archive path) for every file to include
+    entries: List[Tuple[str, str]] = []
     
-    with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-        # Track filenames to avoid duplicates
-        used_names: Dict[str, int] = {}
-        
-        # 1. Add period-level files
-        period_files = db.query(FileModel).filter(
-            FileModel.period_id == period_id,
-            FileModel.task_id.is_(None)
-        ).all()
-        
-        for file in period_files:
-            if not file.is_external_link and os.path.exists(file.file_path):
-                # Create unique filename if necessary
-                base_name = file.original_filename
-                if base_name in used_names:
-                    used_names[base_name] += 1
-                    name_parts = os.path.splitext(base_name)
-                    base_name = f"{name_parts[0]}_{used_names[base_name]}{name_parts[1]}"
-                else:
-                    used_names[base_name] = 0
-                
-                zip_path = f"period_files/{sanitize_filename(base_name)}"
-                zip_file.write(file.file_path, zip_path)
-        
-        # 2. Add task files organized by task
-        tasks = db.query(TaskModel).filter(TaskModel.period_id == period_id).all()
-        
-        for task in tasks:
-            task_files = db.query(FileModel).filter(FileModel.task_id == task.id).all()
-            
-            if task_files:
-                task_folder = sanitize_filename(task.name)
-                
-                for file in task_files:
-                    if not file.is_external_link and os.path.exists(file.file_path):
-                        # Create unique filename within task folder
-                        base_name = file.original_filename
-                        file_key = f"{task_folder}/{base_name}"
-                        
-                        if file_key in used_names:
-                            used_names[file_key] += 1
-                            name_parts = os.path.splitext(base_name)
-                            base_name = f"{name_parts[0]}_{used_names[file_key]}{name_parts[1]}"
-                        else:
-                            used_names[file_key] = 0
-                        
-                        zip_path = f"tasks/{task_folder}/{sanitize_filename(base_name)}"
-                        zip_file.write(file.file_path, zip_path)
-        
-        # 3. Add trial balance files
-        trial_balances = db.query(TrialBalanceModel).filter(
-            TrialBalanceModel.period_id == period_id
-        ).all()
-        
-        for tb in trial_balances:
-            # Add the main trial balance CSV if it exists
-            if os.path.exists(tb.file_path):
-                zip_path = f"trial_balance/{sanitize_filename(tb.source_filename)}"
-                zip_file.write(tb.file_path, zip_path)
-            
-            # Add account attachments
-            for account in tb.accounts:
-                attachments = db.query(TrialBalanceAttachmentModel).filter(
-                    TrialBalanceAttachmentModel.account_id == account.id
-                ).all()
-                
-                for attachment in attachments:
-                    if not attachment.is_external_link and os.path.exists(attachment.file_path):
-                        account_folder = f"{account.account_number}_{sanitize_filename(account.account_name)}"
-                        base_name = attachment.original_filename
-                        file_key = f"tb_account_{account_folder}/{base_name}"
-                        
-                        if file_key in used_names:
-                            used_names[file_key] += 1
-                            name_parts = os.path.splitext(base_name)
-                            base_name = f"{name_parts[0]}_{used_names[file_key]}{name_parts[1]}"
-                        else:
-                            used_names[file_key] = 0
-                        
-                        zip_path = f"trial_balance/{account_folder}/{sanitize_filename(base_name)}"
-                        zip_file.write(attachment.file_path, zip_path)
-                
-                # Add validation evidence files
-                validations = db.query(TrialBalanceValidationModel).filter(
-                    TrialBalanceValidationModel.account_id == account.id,
-                    TrialBalanceValidationModel.evidence_path.isnot(None)
-                ).all()
-                
-                for validation in validations:
-                    if os.path.exists(validation.evidence_path):
-                        account_folder = f"{account.account_number}_{sanitize_filename(account.account_name)}"
-                        base_name = validation.evidence_original_filename or "evidence.pdf"
-                        file_key = f"tb_validation_{account_folder}/{base_name}"
-                        
-                        if file_key in used_names:
-                            used_names[file_key] += 1
-                            name_parts = os.path.splitext(base_name)
-                            base_name = f"{name_parts[0]}_{used_names[file_key]}{name_parts[1]}"
-                        else:
-                            used_names[file_key] = 0
-                        
-                        zip_path = f"trial_balance/{account_folder}/validations/{sanitize_filename(base_name)}"
-                        zip_file.write(validation.evidence_path, zip_path)
+    # Track filenames to avoid duplicates
+    used_names: Dict[str, int] = {}
     
-    # Reset buffer position to beginning
-    zip_buffer.seek(0)
-    return zip_buffer
-
-
-def estimate_zip_size(db: Session, period_id: int) -> int:
-    """
-    Estimate the total size of all files for a period (in bytes).
-    
-    Returns approximate size in bytes.
-    """
-    total_size = 0
-    
-    # Period files
+    # 1. Add period-level files
     period_files = db.query(FileModel).filter(
         FileModel.period_id == period_id,
         FileModel.task_id.is_(None)
     ).all()
-    total_size += sum(f.file_size for f in period_files if not f.is_external_link)
     
-    # Task files
-    task_files = db.query(FileModel).join(TaskModel).filter(
-        TaskModel.period_id == period_id,
-        FileModel.task_id.isnot(None)
-    ).all()
-    total_size += sum(f.file_size for f in task_files if not f.is_external_link)
+    for file in period_files:
+        if not file.is_external_link and os.path.exists(file.file_path):
+            # Create unique filename if necessary
+            base_name = file.original_filename
+            if base_name in used_names:
+                used_names[base_name] += 1
+                name_parts = os.path.splitext(base_name)
+                base_name = f"{name_parts[0]}_{used_names[base_name]}{name_parts[1]}"
+            else:
+                used_names[base_name] = 0
+            
+            zip_path = f"period_files/{sanitize_filename(base_name)}"
+            entries.append((file.file_path, zip_path))
     
-    # Trial balance attachments
-    tb_attachments = db.query(TrialBalanceAttachmentModel).join(
-        TrialBalanceModel.accounts
-    ).join(TrialBalanceModel).filter(
+    # 2. Add task files organized by task
+    tasks = db.query(TaskModel).filter(TaskModel.period_id == period_id).all()
+    
+    for task in tasks:
+        task_files = db.query(FileModel).filter(FileModel.task_id == task.id).all()
+        
+        if task_files:
+            task_folder = sanitize_filename(task.name)
+            
+            for file in task_files:
+                if not file.is_external_link and os.path.exists(file.file_path):
+                    # Create unique filename within task folder
+                    base_name = file.original_filename
+                    file_key = f"{task_folder}/{base_name}"
+                    
+                    if file_key in used_names:
+                        used_names[file_key] += 1
+                        name_parts = os.path.splitext(base_name)
+                        base_name = f"{name_parts[0]}_{used_names[file_key]}{name_parts[1]}"
+                    else:
+                        used_names[file_key] = 0
+                    
+                    zip_path = f"tasks/{task_folder}/{sanitize_filename(base_name)}"
+                    entries.append((file.file_path, zip_path))
+    
+    # 3. Add trial balance files
+    trial_balances = db.query(TrialBalanceModel).filter(
         TrialBalanceModel.period_id == period_id
     ).all()
-    total_size += sum(a.file_size for a in tb_attachments if not a.is_external_link)
     
-    return total_size
-
-
-
-
-
-
-
+    for tb in trial_balances:
+        # Add the main trial balance CSV if it exists
+        if os.path.exists(tb.file_path):
+            zip_path = f"trial_balance/{sanitize_filename(tb.source_filename)}"
+            entries.append((tb.file_path, zip_path))
+        
+        # Add account attachments
+        for account in tb.accounts:
+            attachments = db.query(TrialBalanceAttachmentModel).filter(
+                TrialBalanceAttachmentModel.account_id == account.id
+            ).all()
+            
+            for attachment in attachments:
+                if not attachment.is_external_link and os.path.exists(attachment.file_path):
+                    account_folder = f"{account.account_number}_{sanitize_filename(account.account_name)}"
+                    base_name = attachment.original_filename
+                    file_key = f"tb_account_{account_folder}/{base_name}"
+                    
+                    if file_key in used_names:
+                        used_names[file_key] += 1
+                        name_parts = os.path.splitext(base_name)
+                        base_name = f"{name_parts[0]}_{used_names[file_key]}{name_parts[1]}"
+                    else:
+                        used_names[file_key] = 0
+                    
+                    zip_path = f"trial_balance/{account_folder}/{sanitize_filename(base_name)}"
+                    entries.append((attachment.file_path, zip_path))
+            
+            # Add validation evidence files
+            validations = db.query(TrialBalanceValidationModel).filter(
+                TrialBalanceValidationModel.account_id == account.id,
+                TrialBalanceValidationModel.evidence_path.isnot(None)
+            ).all()
+            
+            for validation in validations:
+                if os.path.exists(validation.evidence_path):
+                    account_folder = f"{account.account_number}_{sanitize_filename(account.account_name)}"
+                    base_name = validation.evidence_original_filename or "evidence.pdf"
+                    file_key = f"tb_validation_{account_folder}/{base_name}"
+                    
+                    if file_key in used_names:
+                        used_names[file_key] += 1
+                        name_parts = os.path.splitext(base_name)
+                        base_name = f"{name_parts[0]}_{used_names[file_key]}{name_parts[1]}"
+                    else:
+                        used_names[file_key] = 0
+                    
+                    zip_path = f"trial_balance/{account_folder}/validations/{sanitize_filename(base_name)}"
+                    entries.append((validation.evidence_path, zip_path))
 
+    return _stream_zip(entries)
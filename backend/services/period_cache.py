@@ -0,0 +1,100 @@
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from backend.config import settings
+from backend.models import Period as PeriodModel, PeriodStatus
+from backend.schemas import Period
+
+
+# Per-process cache of lookup key -> (expires_at, value). Periods change state
+# a few times a month, so hot pages needn't look them up on every call. Values
+# are ids or schema snapshots, never ORM objects, so they are safe to share
+# across sessions. Misses (None) are not cached, so a period created in
+# another worker is found on the next lookup.
+_period_id_cache: Dict[Tuple, Tuple[float, Any]] = {}
+
+
+def _cached(key: Tuple, load: Callable[[], Any]) -> Any:
+    if settings.period_id_cache_ttl <= 0:
+        return load()
+
+    now = time.monotonic()
+    cached = _period_id_cache.get(key)
+    if cached is not None and cached[0] > now:
+        return cached[1]
+
+    ids = load()
+    if ids is not None:
+        _period_id_cache[key] = (now + settings.period_id_cache_ttl, ids)
+    return ids
+
+
+def get_open_period_ids(db: Session) -> List[int]:
+    """Ids of periods that are in progress or under review."""
+    return _cached(("open",), lambda: [
+        row.id for row in db.query(PeriodModel.id).filter(
+            PeriodModel.status.in_([PeriodStatus.IN_PROGRESS, PeriodStatus.UNDER_REVIEW])
+        )
+    ])
+
+
+def get_active_period_ids(db: Session) -> List[int]:
+    """Ids of periods flagged is_active."""
+    return _cached(("active",), lambda: [
+        row.id for row in db.query(PeriodModel.id).filter(PeriodModel.is_active == True)
+    ])
+
+
+def get_period_snapshot(db: Session, period_id: int) -> Optional[Period]:
+    """Period schema for an id, or None if there is no such period."""
+    def load() -> Optional[Period]:
+        period = db.get(PeriodModel, period_id)
+        return Period.model_validate(period) if period else None
+
+    return _cached(("period", period_id), load)
+
+
+def get_previous_period_id(db: Session, period: PeriodModel) -> Optional[int]:
+    """Id of the closest earlier period with the same close type.
+
+    Prefers the calendar month immediately before; otherwise falls back to the
+    latest earlier period.
+    """
+    def load() -> Optional[int]:
+        prev_month = period.month - 1
+        prev_year = period.year
+        if prev_month <= 0:
+            prev_month = 12
+            prev_year -= 1
+
+        candidate = (
+            db.query(PeriodModel.id)
+            .filter(
+                PeriodModel.close_type == period.close_type,
+                PeriodModel.year == prev_year,
+                PeriodModel.month == prev_month,
+            )
+            .order_by(PeriodModel.id.desc())
+            .first()
+        )
+        if candidate is None:
+            candidate = (
+                db.query(PeriodModel.id)
+                .filter(PeriodModel.close_type == period.close_type)
+                .filter(
+                    (PeriodModel.year < period.year)
+                    | ((PeriodModel.year == period.year) & (PeriodModel.month < period.month))
+                )
+                .order_by(PeriodModel.year.desc(), PeriodModel.month.desc())
+                .first()
+            )
+        return candidate.id if candidate else None
+
+    return _cached(("previous", period.close_type, period.year, period.month), load)
+
+
+def clear_period_id_cache() -> None:
+    """Drop cached period lookups; call after creating, changing or deleting a period."""
+    _period_id_cache.clear()
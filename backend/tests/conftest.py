@@ -14,8 +14,10 @@ from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.pool import StaticPool
 
-from backend.database import Base, get_db
+from backend.database import Base, get_db, get_session_factory
 from backend.auth import get_current_user, get_password_hash
+from backend.middleware.compression import TextGZipMiddleware
+from backend.services.period_cache import clear_period_id_cache
 from backend.models import (
     User as UserModel,
     UserRole,
@@ -79,7 +81,7 @@ engine = create_engine(
     connect_args={"check_same_thread": False},
     poolclass=StaticPool,
 )
-TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
 
 
 @pytest.fixture(scope="session", autouse=True)
@@ -95,6 +97,7 @@ def clean_database():
     """Ensure each test starts with a clean schema."""
     Base.metadata.drop_all(bind=engine)
     Base.metadata.create_all(bind=engine)
+    clear_period_id_cache()
 
 
 @pytest.fixture
@@ -131,6 +134,8 @@ def client():
     Uses in-memory SQLite database for isolation.
     """
     app = FastAPI()
+    # Same compression as backend.main, so headers match production
+    app.add_middleware(TextGZipMiddleware, minimum_size=1024)
     
     # Include all routers
     app.include_router(auth.router)
@@ -156,6 +161,7 @@ def client():
             db.close()
 
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_session_factory] = lambda: TestingSessionLocal
     app.dependency_overrides[get_current_user] = lambda: _FakeUser()
 
     with TestClient(app) as test_client:
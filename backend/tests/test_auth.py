@@ -10,6 +10,7 @@ import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy.orm import Session
 
+from backend.auth import pwd_context
 from backend.models import User as UserModel
 
 
@@ -59,6 +60,24 @@ class TestAuthLogin:
         assert response.status_code == 401
         assert "Incorrect email or password" in response.json()["detail"]
 
+    def test_login_rehashes_bcrypt_password(self, client: TestClient, db_session: Session, sample_user: UserModel):
+        """Should replace a legacy bcrypt hash with argon2id on successful login"""
+        sample_user.hashed_password = pwd_context.handler("bcrypt").hash("password123")
+        db_session.commit()
+
+        response = client.post(
+            "/api/auth/login",
+            data={
+                "username": "sample@example.com",
+                "password": "password123"
+            }
+        )
+
+        assert response.status_code == 200
+        db_session.refresh(sample_user)
+        assert pwd_context.identify(sample_user.hashed_password) == "argon2"
+        assert pwd_context.verify("password123", sample_user.hashed_password)
+
     def test_login_missing_credentials(self, client: TestClient):
         """Should return 422 when credentials are missing"""
         response = client.post("/api/auth/login", data={})
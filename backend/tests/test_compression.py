@@ -0,0 +1,71 @@
+"""
+Tests for TextGZipMiddleware
+
+Behavior Testing:
+- JSON and text responses over the threshold are gzipped
+- File downloads and partial responses are passed through untouched
+"""
+
+import pytest
+from fastapi import FastAPI, Response
+from fastapi.responses import FileResponse
+from fastapi.testclient import TestClient
+
+from backend.middleware.compression import TextGZipMiddleware
+
+
+PAYLOAD = b"x" * 4096
+
+
+@pytest.fixture
+def gzip_client(tmp_path):
+    app = FastAPI()
+    app.add_middleware(TextGZipMiddleware, minimum_size=1024)
+    download = tmp_path / "report.pdf"
+    download.write_bytes(PAYLOAD)
+
+    @app.get("/json")
+    async def json_payload():
+        return {"data": PAYLOAD.decode()}
+
+    @app.get("/download")
+    async def file_download():
+        return FileResponse(download, media_type="application/pdf")
+
+    @app.get("/partial")
+    async def partial_text():
+        return Response(
+            content=PAYLOAD,
+            status_code=206,
+            media_type="text/plain",
+            headers={"Content-Range": f"bytes 0-{len(PAYLOAD) - 1}/{len(PAYLOAD) * 2}"},
+        )
+
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+class TestTextGZipMiddleware:
+    """Test suite for the JSON/text-only GZip middleware"""
+
+    def test_json_is_compressed(self, gzip_client: TestClient):
+        """Should gzip JSON bodies over the threshold"""
+        response = gzip_client.get("/json", headers={"Accept-Encoding": "gzip"})
+
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.json() == {"data": PAYLOAD.decode()}
+
+    def test_file_download_is_not_compressed(self, gzip_client: TestClient):
+        """Should pass binary downloads through with their Content-Length"""
+        response = gzip_client.get("/download", headers={"Accept-Encoding": "gzip"})
+
+        assert "content-encoding" not in response.headers
+        assert response.headers["content-length"] == str(len(PAYLOAD))
+        assert response.content == PAYLOAD
+
+    def test_partial_response_is_not_compressed(self, gzip_client: TestClient):
+        """Should never compress a byte range, whatever its type"""
+        response = gzip_client.get("/partial", headers={"Accept-Encoding": "gzip"})
+
+        assert "content-encoding" not in response.headers
+        assert response.content == PAYLOAD
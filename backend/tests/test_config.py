@@ -0,0 +1,62 @@
+"""
+Tests for application settings
+
+Behavior Testing:
+- CORS origin list includes dev origins in debug mode and is deduplicated
+- Origins are normalized and environment values are coerced
+"""
+
+import pytest
+
+from backend.config import Settings, normalize_origin
+
+
+class TestOriginsList:
+    """Test suite for Settings.origins_list"""
+
+    def test_debug_includes_dev_origins(self):
+        """Should include the Vite dev server origin in debug mode"""
+        settings = Settings(debug=True)
+
+        assert "http://localhost:5173" in settings.origins_list
+
+    def test_origins_are_deduplicated(self):
+        """Should not repeat origins that appear in both config and dev defaults"""
+        settings = Settings(
+            debug=True,
+            allowed_origins="http://localhost:5173,http://localhost:5173/,HTTP://LOCALHOST:3000",
+        )
+
+        assert len(settings.origins_list) == len(set(settings.origins_list))
+        assert settings.origins_frozenset == frozenset(settings.origins_list)
+
+    def test_production_uses_configured_origins_only(self):
+        """Should not add dev origins when debug is off"""
+        settings = Settings(debug=False, allowed_origins="https://close.example.com/")
+
+        assert settings.origins_list == ("https://close.example.com",)
+
+    def test_normalize_origin(self):
+        """Should lowercase scheme/host and strip trailing slashes"""
+        assert normalize_origin(" HTTPS://Close.Example.com:8443/ ") == "https://close.example.com:8443"
+
+
+class TestFromEnv:
+    """Test suite for Settings.from_env"""
+
+    def test_reads_and_coerces_environment(self, monkeypatch: pytest.MonkeyPatch):
+        """Should coerce int and bool fields from environment strings"""
+        monkeypatch.setenv("MAX_FILE_SIZE_MB", "10")
+        monkeypatch.setenv("DEBUG", "false")
+
+        settings = Settings.from_env()
+
+        assert settings.max_file_size_mb == 10
+        assert settings.debug is False
+
+    def test_rejects_invalid_boolean(self, monkeypatch: pytest.MonkeyPatch):
+        """Should fail loudly on unparseable booleans"""
+        monkeypatch.setenv("DEBUG", "maybe")
+
+        with pytest.raises(ValueError):
+            Settings.from_env()
@@ -90,3 +90,98 @@ def test_dashboard_stats_includes_critical_path(client, db_session):
 
     dependent_names = {dep['name'] for dep in primary['dependents']}
     assert dependent_names == {'Prepare bank reconciliation', 'Review outstanding checks'}
+
+
+def test_dashboard_stats_counters_and_summaries(client, db_session):
+    now = datetime.now(timezone.utc)
+    today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+
+    user = User(id=1, email="controller@example.com", name="Controller", hashed_password="hashed",
+                role=UserRole.ADMIN, is_active=True)
+    period = Period(id=1, name="November 2025", month=11, year=2025, close_type=CloseType.MONTHLY,
+                    status=PeriodStatus.IN_PROGRESS, is_active=True)
+
+    def task(task_id, status, **fields):
+        return Task(id=task_id, period_id=period.id, name=f"Task {task_id}", status=status, owner_id=user.id, **fields)
+
+    db_session.add_all([
+        user,
+        period,
+        task(1, TaskStatus.COMPLETE, started_at=now - timedelta(hours=5), completed_at=now - timedelta(hours=3),
+             due_date=now - timedelta(days=1)),
+        task(2, TaskStatus.COMPLETE),
+        task(3, TaskStatus.IN_PROGRESS, due_date=today_start),
+        task(4, TaskStatus.BLOCKED, due_date=now + timedelta(days=1)),
+        task(5, TaskStatus.REVIEW),
+        task(6, TaskStatus.NOT_STARTED, due_date=now + timedelta(days=10)),
+        task(7, TaskStatus.COMPLETE, due_date=now - timedelta(days=2)),
+    ])
+    db_session.commit()
+
+    response = client.get('/api/dashboard/stats')
+    assert response.status_code == 200
+
+    payload = response.json()
+    assert payload['total_tasks'] == 7
+    assert payload['completed_tasks'] == 3
+    assert payload['in_progress_tasks'] == 1
+    assert payload['overdue_tasks'] == 1
+    assert payload['tasks_due_today'] == 1
+    assert payload['completion_percentage'] == 42.86
+    assert payload['avg_time_to_complete'] == 2.0
+    assert [item['id'] for item in payload['blocked_tasks']] == [4]
+    assert [item['id'] for item in payload['review_tasks']] == [5]
+    assert [item['id'] for item in payload['at_risk_tasks']] == [3, 4]
+
+
+def test_dashboard_stats_not_modified_when_etag_matches(client, db_session):
+    seed_period_with_dependencies(db_session)
+
+    first = client.get('/api/dashboard/stats')
+    assert first.status_code == 200
+    etag = first.headers['etag']
+
+    repeat = client.get('/api/dashboard/stats', headers={'If-None-Match': etag})
+    assert repeat.status_code == 304
+    assert repeat.content == b''
+
+    db_session.query(Task).filter(Task.id == 1).update({Task.status: TaskStatus.COMPLETE})
+    db_session.commit()
+
+    changed = client.get('/api/dashboard/stats', headers={'If-None-Match': etag})
+    assert changed.status_code == 200
+    assert changed.headers['etag'] != etag
+
+
+def test_cache_invalidation_does_not_block_event_loop(monkeypatch):
+    import asyncio
+    import dataclasses
+
+    from backend.services import dashboard_cache
+
+    calls = []
+
+    class AsyncClient:
+        async def incr(self, key):
+            calls.append(("async", key))
+
+    class SyncClient:
+        def incr(self, key):
+            calls.append(("sync", key))
+
+    monkeypatch.setattr(
+        dashboard_cache, "settings",
+        dataclasses.replace(dashboard_cache.settings, dashboard_cache_ttl=15),
+    )
+    monkeypatch.setattr(dashboard_cache, "_get_async_client", AsyncClient)
+    monkeypatch.setattr(dashboard_cache, "_get_sync_client", SyncClient)
+
+    async def commit_in_handler():
+        dashboard_cache.DashboardStatsCache.invalidate()
+        assert calls == []
+        await asyncio.gather(*dashboard_cache._pending_invalidations)
+
+    asyncio.run(commit_in_handler())
+    dashboard_cache.DashboardStatsCache.invalidate()
+
+    assert calls == [("async", dashboard_cache.EPOCH_KEY), ("sync", dashboard_cache.EPOCH_KEY)]
@@ -0,0 +1,86 @@
+"""
+Tests for FastCORSMiddleware
+
+Behavior Testing:
+- Preflight requests from allowed and disallowed origins
+- Simple requests receive CORS headers only for allowed origins
+"""
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend.middleware.fast_cors import FastCORSMiddleware
+
+
+ALLOWED_ORIGIN = "http://localhost:5173"
+
+
+@pytest.fixture
+def cors_client():
+    app = FastAPI()
+    app.add_middleware(FastCORSMiddleware, origins=[ALLOWED_ORIGIN])
+
+    @app.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+class TestFastCORSMiddleware:
+    """Test suite for the pure-ASGI CORS middleware"""
+
+    def test_preflight_allowed_origin(self, cors_client: TestClient):
+        """Should short-circuit preflight with the echoed origin and headers"""
+        response = cors_client.options(
+            "/ping",
+            headers={
+                "Origin": ALLOWED_ORIGIN,
+                "Access-Control-Request-Method": "POST",
+                "Access-Control-Request-Headers": "authorization, content-type",
+            },
+        )
+
+        assert response.status_code == 204
+        assert response.headers["access-control-allow-origin"] == ALLOWED_ORIGIN
+        assert response.headers["access-control-allow-credentials"] == "true"
+        assert response.headers["access-control-allow-headers"] == "authorization, content-type"
+        assert "POST" in response.headers["access-control-allow-methods"]
+
+    def test_preflight_disallowed_origin(self, cors_client: TestClient):
+        """Should reject preflight from unknown origins"""
+        response = cors_client.options(
+            "/ping",
+            headers={
+                "Origin": "http://evil.example.com",
+                "Access-Control-Request-Method": "GET",
+            },
+        )
+
+        assert response.status_code == 400
+        assert "access-control-allow-origin" not in response.headers
+
+    def test_simple_request_allowed_origin(self, cors_client: TestClient):
+        """Should append CORS headers to normal responses"""
+        response = cors_client.get("/ping", headers={"Origin": ALLOWED_ORIGIN})
+
+        assert response.status_code == 200
+        assert response.json() == {"ok": True}
+        assert response.headers["access-control-allow-origin"] == ALLOWED_ORIGIN
+        assert response.headers["vary"] == "Origin"
+
+    def test_simple_request_disallowed_origin(self, cors_client: TestClient):
+        """Should pass through without CORS headers for unknown origins"""
+        response = cors_client.get("/ping", headers={"Origin": "http://evil.example.com"})
+
+        assert response.status_code == 200
+        assert "access-control-allow-origin" not in response.headers
+
+    def test_request_without_origin(self, cors_client: TestClient):
+        """Should leave same-origin requests untouched"""
+        response = cors_client.get("/ping")
+
+        assert response.status_code == 200
+        assert "access-control-allow-origin" not in response.headers
@@ -15,11 +15,19 @@ Endpoint Testing:
 Note: File upload tests require special handling for multipart form data
 """
 
+import io
+import zipfile
+from datetime import datetime, timedelta, timezone
 import pytest
+from dataclasses import replace
 from fastapi.testclient import TestClient
+from sqlalchemy import event
 from sqlalchemy.orm import Session
 
-from backend.models import Task as TaskModel, Period as PeriodModel, File as FileModel
+from backend.routers import files as files_router
+from backend.models import (
+    Task as TaskModel, Period as PeriodModel, File as FileModel, User as UserModel, AuditLog as AuditLogModel
+)
 
 
 class TestGetTaskFiles:
@@ -67,6 +75,21 @@ class TestGetOldFiles:
         
         assert response.status_code == 200
 
+    def test_get_old_files_paginates(self, client: TestClient, db_session: Session, sample_task: TaskModel):
+        """Should page through files uploaded before the threshold, oldest first"""
+        now = datetime.now(timezone.utc)
+        for days in (90, 60, 45, 1):
+            db_session.add(FileModel(task_id=sample_task.id, filename=f"f{days}", original_filename=f"{days}.txt",
+                                     file_path="", file_size=1, uploaded_at=now - timedelta(days=days)))
+        db_session.commit()
+
+        first = client.get("/api/files/old-files/?days_threshold=30&limit=2")
+        second = client.get("/api/files/old-files/?days_threshold=30&skip=2&limit=2")
+
+        assert [f["original_filename"] for f in first.json()] == ["90.txt", "60.txt"]
+        assert [f["original_filename"] for f in second.json()] == ["45.txt"]
+        assert second.json()[0]["task_id"] == sample_task.id
+
 
 class TestGetPeriodFiles:
     """Test suite for GET /api/files/period/{period_id}/all"""
@@ -94,6 +117,243 @@ class TestGetPeriodFiles:
         
         assert response.status_code == 404
 
+    def test_get_period_files_query_count_is_constant(
+        self, client: TestClient, db_session: Session, sample_period: PeriodModel, sample_user: UserModel
+    ):
+        """Should not issue more queries as tasks and files are added"""
+        def add_task_with_files(name: str):
+            task = TaskModel(name=name, period_id=sample_period.id, owner_id=sample_user.id)
+            db_session.add(task)
+            db_session.flush()
+            db_session.add_all([
+                FileModel(task_id=task.id, filename=f"{name}-{n}.pdf", original_filename=f"{name}-{n}.pdf",
+                          file_path="", file_size=1, uploaded_by_id=sample_user.id)
+                for n in range(2)
+            ])
+            db_session.commit()
+
+        def count_queries() -> int:
+            statements = []
+            listener = lambda *args: statements.append(args[2])
+            event.listen(db_session.bind, "before_cursor_execute", listener)
+            try:
+                response = client.get(f"/api/files/period/{sample_period.id}/all")
+            finally:
+                event.remove(db_session.bind, "before_cursor_execute", listener)
+            assert response.status_code == 200
+            return len(statements)
+
+        add_task_with_files("first")
+        baseline = count_queries()
+
+        for name in ("second", "third", "fourth"):
+            add_task_with_files(name)
+
+        assert count_queries() == baseline
+
+
+class TestUploadFile:
+    """Test suite for POST /api/files/upload"""
+
+    @pytest.fixture
+    def storage(self, tmp_path, monkeypatch):
+        """Store uploads under tmp_path with a 1MB size limit."""
+        monkeypatch.setattr(
+            files_router, "settings",
+            replace(files_router.settings, file_storage_path=str(tmp_path), max_file_size_mb=1)
+        )
+        return tmp_path
+
+    def test_upload_file_success(self, client: TestClient, db_session: Session, sample_task: TaskModel, storage):
+        """Should write the upload to disk and record its size"""
+        content = b"x" * (files_router.UPLOAD_CHUNK_SIZE // 2 + 10)
+        response = client.post(
+            "/api/files/upload",
+            params={"task_id": sample_task.id},
+            files={"file": ("support.pdf", content, "application/pdf")},
+        )
+
+        assert response.status_code == 201
+        data = response.json()
+        assert data["file_size"] == len(content)
+        saved = list((storage / str(sample_task.id)).iterdir())
+        assert len(saved) == 1
+        assert saved[0].read_bytes() == content
+        audit = db_session.query(AuditLogModel).filter(AuditLogModel.action == "file_uploaded").one()
+        assert audit.entity_id == data["id"]
+
+    def test_upload_file_reads_form_fields(self, client: TestClient, sample_task: TaskModel, storage):
+        """Should take description and file_date from the multipart form"""
+        response = client.post(
+            "/api/files/upload",
+            params={"task_id": sample_task.id},
+            data={"description": "Bank statement", "file_date": "2025-01-31"},
+            files={"file": ("support.pdf", b"content", "application/pdf")},
+        )
+
+        assert response.status_code == 201
+        assert response.json()["description"] == "Bank statement"
+        assert response.json()["file_date"] == "2025-01-31"
+
+    def test_upload_file_invalid_date(self, client: TestClient, sample_task: TaskModel, storage):
+        """Should reject a file_date that is not a date"""
+        response = client.post(
+            "/api/files/upload",
+            params={"task_id": sample_task.id},
+            data={"file_date": "end of month"},
+            files={"file": ("support.pdf", b"content", "application/pdf")},
+        )
+
+        assert response.status_code == 422
+        assert not (storage / str(sample_task.id)).exists()
+
+    def test_upload_file_too_large(self, client: TestClient, sample_task: TaskModel, storage):
+        """Should reject uploads over the limit and leave no partial file"""
+        content = b"x" * (1024 * 1024 + 1)
+        response = client.post(
+            "/api/files/upload",
+            params={"task_id": sample_task.id},
+            files={"file": ("big.pdf", content, "application/pdf")},
+        )
+
+        assert response.status_code == 413
+        assert list((storage / str(sample_task.id)).iterdir()) == []
+
+
+LEDGER_CONTENT = b"0123456789" * 400
+
+
+class TestStreamFile:
+    """Test suite for GET /api/files/download/{file_id}"""
+
+    def test_stream_file_records_access(
+        self, client: TestClient, db_session: Session, sample_task: TaskModel, tmp_path
+    ):
+        """Should return the content and stamp last_accessed_at afterwards"""
+        source = tmp_path / "support.txt"
+        source.write_bytes(b"supporting detail")
+        file = FileModel(task_id=sample_task.id, filename="s", original_filename="support.txt",
+                         file_path=str(source), file_size=source.stat().st_size, mime_type="text/plain")
+        db_session.add(file)
+        db_session.commit()
+
+        response = client.get(f"/api/files/download/{file.id}")
+
+        assert response.status_code == 200
+        assert response.content == b"supporting detail"
+        db_session.expire_all()
+        assert db_session.get(FileModel, file.id).last_accessed_at is not None
+
+    def test_stream_file_skips_recent_stamp(
+        self, client: TestClient, db_session: Session, sample_task: TaskModel, tmp_path
+    ):
+        """Should only restamp files not accessed within ACCESS_STAMP_INTERVAL"""
+        source = tmp_path / "support.txt"
+        source.write_bytes(b"supporting detail")
+        now = datetime.now(timezone.utc)
+        recent = now - timedelta(seconds=5)
+        stale = now - files_router.ACCESS_STAMP_INTERVAL * 10
+        files = [
+            FileModel(task_id=sample_task.id, filename=name, original_filename="support.txt",
+                      file_path=str(source), file_size=17, last_accessed_at=stamp)
+            for name, stamp in (("recent", recent), ("stale", stale))
+        ]
+        db_session.add_all(files)
+        db_session.commit()
+
+        for file in files:
+            client.get(f"/api/files/download/{file.id}")
+
+        db_session.expire_all()
+        recent_file, stale_file = (db_session.get(FileModel, file.id) for file in files)
+        assert recent_file.last_accessed_at.replace(tzinfo=None) == recent.replace(tzinfo=None)
+        assert stale_file.last_accessed_at.replace(tzinfo=None) > stale.replace(tzinfo=None)
+
+    @pytest.fixture
+    def stored_file(self, db_session: Session, sample_task: TaskModel, tmp_path):
+        # Text and large enough that the GZip middleware would compress it
+        source = tmp_path / "ledger.txt"
+        source.write_bytes(LEDGER_CONTENT)
+        file = FileModel(task_id=sample_task.id, filename="l", original_filename="ledger.txt",
+                         file_path=str(source), file_size=len(LEDGER_CONTENT), mime_type="text/plain")
+        db_session.add(file)
+        db_session.commit()
+        return file
+
+    @staticmethod
+    def _get_range(client: TestClient, file: FileModel, byte_range: str):
+        return client.get(
+            f"/api/files/download/{file.id}",
+            headers={"Accept-Encoding": "gzip", "Range": byte_range},
+        )
+
+    def test_stream_file_serves_byte_range(self, client: TestClient, stored_file: FileModel):
+        """Should answer a Range request with 206 and only the requested, uncompressed bytes"""
+        response = self._get_range(client, stored_file, "bytes=100-2099")
+
+        assert response.status_code == 206
+        assert response.content == LEDGER_CONTENT[100:2100]
+        assert response.headers["content-range"] == f"bytes 100-2099/{len(LEDGER_CONTENT)}"
+        assert response.headers["content-length"] == "2000"
+        assert "content-encoding" not in response.headers
+        assert response.headers["accept-ranges"] == "bytes"
+
+    def test_stream_file_serves_suffix_range(self, client: TestClient, stored_file: FileModel):
+        """Should serve the last N bytes for a suffix range"""
+        response = self._get_range(client, stored_file, "bytes=-3")
+
+        assert response.status_code == 206
+        assert response.content == LEDGER_CONTENT[-3:]
+
+    def test_stream_file_unsatisfiable_range(self, client: TestClient, stored_file: FileModel):
+        """Should reject a range that starts past the end of the file"""
+        response = self._get_range(client, stored_file, f"bytes={len(LEDGER_CONTENT)}-")
+
+        assert response.status_code == 416
+        assert response.headers["content-range"] == f"bytes */{len(LEDGER_CONTENT)}"
+
+    def test_stream_file_ignores_multiple_ranges(self, client: TestClient, stored_file: FileModel):
+        """Should fall back to the whole file for ranges it does not serve"""
+        response = self._get_range(client, stored_file, "bytes=0-1,4-5")
+
+        assert response.status_code == 200
+        assert response.content == LEDGER_CONTENT
+
+
+class TestDownloadPeriodZip:
+    """Test suite for GET /api/files/period/{period_id}/download-zip"""
+
+    def test_download_period_zip_contains_files(
+        self, client: TestClient, db_session: Session, sample_period: PeriodModel, sample_task: TaskModel, tmp_path
+    ):
+        """Should stream a zip with period and task files"""
+        period_source = tmp_path / "period.txt"
+        period_source.write_bytes(b"period evidence")
+        task_source = tmp_path / "task.bin"
+        task_source.write_bytes(bytes(range(256)) * 8192)
+        db_session.add_all([
+            FileModel(period_id=sample_period.id, filename="p", original_filename="period.txt",
+                      file_path=str(period_source), file_size=period_source.stat().st_size),
+            FileModel(task_id=sample_task.id, filename="t", original_filename="task.bin",
+                      file_path=str(task_source), file_size=task_source.stat().st_size),
+        ])
+        db_session.commit()
+
+        response = client.get(f"/api/files/period/{sample_period.id}/download-zip")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/zip"
+        assert response.headers["accept-ranges"] == "none"
+        with zipfile.ZipFile(io.BytesIO(response.content)) as archive:
+            assert archive.read("period_files/period.txt") == b"period evidence"
+            assert archive.read(f"tasks/{sample_task.name}/task.bin") == task_source.read_bytes()
+
+    def test_download_period_zip_not_found(self, client: TestClient):
+        """Should return 404 for non-existent period"""
+        response = client.get("/api/files/period/99999/download-zip")
+
+        assert response.status_code == 404
+
 
 class TestLinkExternalFile:
     """Test suite for POST /api/files/link"""
@@ -0,0 +1,110 @@
+"""
+Tests for application-level endpoints defined in backend.main
+
+Endpoint Testing:
+- GET / - API information
+- GET /api/health - Health check
+- GET /files/{path} - Serve stored files
+"""
+
+import dataclasses
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend import main
+
+
+@pytest.fixture
+def app_client(tmp_path, monkeypatch):
+    """Client for the real app with file storage pointed at a temp directory.
+
+    The client is not entered as a context manager so startup handlers (which
+    create tables in the configured database) do not run.
+    """
+    monkeypatch.setattr(main, "FILES_ROOT", str(tmp_path))
+    return TestClient(main.app)
+
+
+class TestServeStoredFile:
+    """Test suite for GET /files/{path}"""
+
+    def test_serves_existing_file(self, app_client: TestClient, tmp_path):
+        """Should return the stored file contents"""
+        (tmp_path / "1").mkdir()
+        (tmp_path / "1" / "report.txt").write_text("hello")
+
+        response = app_client.get("/files/1/report.txt")
+
+        assert response.status_code == 200
+        assert response.text == "hello"
+        assert response.headers["content-length"] == "5"
+
+    def test_download_is_not_gzipped(self, app_client: TestClient, tmp_path):
+        """Should send file bytes as-is even when the client accepts gzip"""
+        content = bytes(range(256)) * 800
+        (tmp_path / "statement.pdf").write_bytes(content)
+
+        response = app_client.get("/files/statement.pdf", headers={"Accept-Encoding": "gzip"})
+
+        assert response.status_code == 200
+        assert "content-encoding" not in response.headers
+        assert response.headers["content-length"] == str(len(content))
+        assert response.content == content
+
+    def test_missing_file_returns_404(self, app_client: TestClient):
+        """Should return 404 for unknown files"""
+        response = app_client.get("/files/missing.txt")
+
+        assert response.status_code == 404
+
+    def test_directory_returns_404(self, app_client: TestClient, tmp_path):
+        """Should not serve directories"""
+        (tmp_path / "folder").mkdir()
+
+        response = app_client.get("/files/folder")
+
+        assert response.status_code == 404
+
+    def test_path_traversal_rejected(self, app_client: TestClient, tmp_path):
+        """Should not serve files outside the storage directory"""
+        outside = tmp_path.parent / "outside-secret.txt"
+        outside.write_text("secret")
+
+        response = app_client.get("/files/..%2Foutside-secret.txt")
+
+        assert response.status_code == 404
+
+    def test_accel_redirect(self, app_client: TestClient, tmp_path, monkeypatch):
+        """Should delegate the body to the proxy when a prefix is configured"""
+        (tmp_path / "report.txt").write_text("hello")
+        monkeypatch.setattr(
+            main, "settings", dataclasses.replace(main.settings, files_accel_redirect_prefix="/_files/")
+        )
+
+        response = app_client.get("/files/report.txt")
+
+        assert response.status_code == 200
+        assert response.headers["x-accel-redirect"] == "/_files/report.txt"
+        assert response.content == b""
+
+
+class TestStaticEndpoints:
+    """Test suite for GET / and GET /api/health"""
+
+    def test_health_check(self, app_client: TestClient):
+        """Should report healthy"""
+        response = app_client.get("/api/health")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/json"
+        assert response.json() == {"status": "healthy"}
+
+    def test_root(self, app_client: TestClient):
+        """Should describe the API"""
+        response = app_client.get("/")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["name"] == main.settings.app_name
+        assert data["status"] == "operational"
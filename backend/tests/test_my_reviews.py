@@ -5,6 +5,7 @@ from backend.models import (
     Period,
     Task,
     Approval,
+    File,
     TaskStatus,
     PeriodStatus,
     CloseType,
@@ -112,3 +113,55 @@ def test_my_reviews_handles_inactive_periods(client, db_session):
     assert payload['total_pending'] == 0
     assert payload['review_tasks'] == []
     assert payload['pending_approvals'] == []
+
+
+def test_my_reviews_includes_file_counts(client, db_session):
+    seed_review_data(db_session)
+    db_session.add_all([
+        File(task_id=task_id, filename=f"{task_id}-{n}.pdf", original_filename="support.pdf",
+             file_path=f"/tmp/{task_id}-{n}.pdf", file_size=10)
+        for task_id, n in ((2, 1), (2, 2))
+    ])
+    db_session.commit()
+
+    response = client.get('/api/dashboard/my-reviews')
+    assert response.status_code == 200
+    payload = response.json()
+
+    counts = {task['id']: task['file_count'] for task in payload['review_tasks']}
+    assert counts == {1: 0, 2: 2}
+    assert payload['pending_approvals'][0]['file_count'] == 2
+    assert payload['pending_approvals'][0]['assignee']['name'] == 'Lead Reviewer'
+    assert payload['pending_approvals'][0]['period']['name'] == 'December 2025'
+
+
+def test_my_reviews_lists_owned_and_assigned_task_once(client, db_session):
+    seed_review_data(db_session)
+    # The current user (id 1) both owns and is assigned this task
+    db_session.query(Task).filter(Task.id == 1).update({Task.owner_id: 1})
+    db_session.commit()
+
+    response = client.get('/api/dashboard/my-reviews')
+    assert response.status_code == 200
+    payload = response.json()
+
+    assert [task['id'] for task in payload['review_tasks']] == [1, 2]
+
+
+def test_my_reviews_counts_overdue_task_once(client, db_session):
+    seed_review_data(db_session)
+    # The overdue review task also has a pending approval for the reviewer
+    db_session.add(Approval(
+        task_id=1,
+        reviewer_id=1,
+        status=ApprovalStatus.PENDING,
+        requested_at=datetime.now(timezone.utc),
+    ))
+    db_session.commit()
+
+    response = client.get('/api/dashboard/my-reviews')
+    assert response.status_code == 200
+    payload = response.json()
+
+    assert payload['total_pending'] == 4
+    assert payload['overdue_count'] == 1
@@ -12,12 +12,25 @@ Endpoint Testing:
 - DELETE /api/periods/{period_id} - Delete period
 """
 
+import dataclasses
 import pytest
 from datetime import datetime, timedelta, timezone
 from fastapi.testclient import TestClient
 from sqlalchemy.orm import Session
 
-from backend.models import Period as PeriodModel, Task as TaskModel, TaskStatus
+from backend.models import (
+    CloseType,
+    File as FileModel,
+    Period as PeriodModel,
+    Task as TaskModel,
+    TaskStatus,
+    TaskTemplate as TaskTemplateModel,
+    TrialBalance as TrialBalanceModel,
+    TrialBalanceAccount as TrialBalanceAccountModel,
+    TrialBalanceAttachment as TrialBalanceAttachmentModel,
+)
+from backend.services import period_cache
+from backend.services.period_cache import get_active_period_ids, get_period_snapshot
 
 
 class TestGetPeriods:
@@ -103,6 +116,31 @@ class TestGetPeriodProgress:
         assert "in_progress_tasks" in stats
         assert "completion_percentage" in stats
 
+    def test_get_period_progress_counts(
+        self, client: TestClient, db_session: Session, sample_period: PeriodModel, sample_task: TaskModel
+    ):
+        """Should count tasks by status and department, and overdue open tasks"""
+        yesterday = datetime.now(timezone.utc) - timedelta(days=1)
+        db_session.add_all([
+            TaskModel(name="Overdue", period_id=sample_period.id, owner_id=sample_task.owner_id,
+                      status=TaskStatus.IN_PROGRESS, department="Accounting", due_date=yesterday),
+            TaskModel(name="Done late", period_id=sample_period.id, owner_id=sample_task.owner_id,
+                      status=TaskStatus.COMPLETE, due_date=yesterday),
+        ])
+        db_session.commit()
+
+        response = client.get(f"/api/periods/{sample_period.id}/progress")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["stats"]["total_tasks"] == 3
+        assert data["stats"]["completed_tasks"] == 1
+        assert data["stats"]["in_progress_tasks"] == 1
+        assert data["stats"]["overdue_tasks"] == 1
+        assert data["tasks_by_status"]["not_started"] == 1
+        assert data["tasks_by_status"]["review"] == 0
+        assert data["tasks_by_department"] == {"Accounting": 2, "Unassigned": 1}
+
     def test_get_period_progress_not_found(self, client: TestClient):
         """Should return 404 for non-existent period"""
         response = client.get("/api/periods/99999/progress")
@@ -132,6 +170,63 @@ class TestGetPeriodDetail:
         assert "trial_balance_files_count" in data
 
 
+    def test_get_period_detail_groups_tasks(
+        self, client: TestClient, db_session: Session, sample_period: PeriodModel, sample_task: TaskModel
+    ):
+        """Should count tasks per status and department and list overdue and upcoming work"""
+        now = datetime.now(timezone.utc)
+        db_session.add_all([
+            TaskModel(name="Overdue", period_id=sample_period.id, owner_id=sample_task.owner_id,
+                      status=TaskStatus.IN_PROGRESS, department="Accounting", due_date=now - timedelta(days=1)),
+            TaskModel(name="Due soon", period_id=sample_period.id, owner_id=sample_task.owner_id,
+                      status=TaskStatus.NOT_STARTED, due_date=now + timedelta(days=1)),
+            TaskModel(name="Done late", period_id=sample_period.id, owner_id=sample_task.owner_id,
+                      status=TaskStatus.COMPLETE, department="Accounting", due_date=now - timedelta(days=1)),
+        ])
+        db_session.commit()
+
+        response = client.get(f"/api/periods/{sample_period.id}/detail")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total_tasks"] == 4
+        assert data["completion_percentage"] == 25.0
+        assert data["status_counts"] == {"not_started": 2, "in_progress": 1, "complete": 1}
+        assert [t["name"] for t in data["overdue_tasks"]] == ["Overdue"]
+        assert [t["name"] for t in data["upcoming_tasks"]] == ["Due soon"]
+        departments = {d["department"]: (d["total_tasks"], d["completed_tasks"]) for d in data["department_breakdown"]}
+        assert departments == {"Accounting": (3, 1), None: (1, 0)}
+
+
+    def test_get_period_detail_file_counts(
+        self, client: TestClient, db_session: Session, sample_period: PeriodModel, sample_task: TaskModel
+    ):
+        """Should count period files, task files and trial balance attachments"""
+        def make_file(task_id):
+            return FileModel(period_id=sample_period.id, task_id=task_id, filename="f", original_filename="f.pdf",
+                             file_path="", file_size=1)
+
+        db_session.add_all([make_file(None), make_file(sample_task.id), make_file(sample_task.id)])
+        trial_balance = TrialBalanceModel(period_id=sample_period.id, name="TB", source_filename="tb.csv",
+                                          stored_filename="tb.csv", file_path="")
+        db_session.add(trial_balance)
+        db_session.flush()
+        account = TrialBalanceAccountModel(trial_balance_id=trial_balance.id, account_number="100",
+                                           account_name="Cash")
+        db_session.add(account)
+        db_session.flush()
+        db_session.add(TrialBalanceAttachmentModel(account_id=account.id, filename="s", original_filename="s.pdf",
+                                                   file_path="", file_size=1))
+        db_session.commit()
+
+        response = client.get(f"/api/periods/{sample_period.id}/detail")
+
+        data = response.json()
+        assert data["period_files_count"] == 1
+        assert data["task_files_count"] == 2
+        assert data["trial_balance_files_count"] == 1
+
+
 class TestGetPeriodSummary:
     """Test suite for GET /api/periods/{period_id}/summary"""
 
@@ -155,9 +250,10 @@ class TestGetPeriodSummary:
         assert data["period_name"] == sample_period.name
         assert data["status"] == sample_period.status.value
         assert "completion_percentage" in data
-        assert data["total_tasks"] >= 1
-        assert data["completed_tasks"] >= 1
-        assert data["overdue_tasks"] >= 0
+        assert data["total_tasks"] == 1
+        assert data["completed_tasks"] == 1
+        # Completed tasks are never overdue
+        assert data["overdue_tasks"] == 0
 
     def test_get_period_summary_not_found(self, client: TestClient):
         response = client.get("/api/periods/99999/summary")
@@ -214,6 +310,34 @@ class TestCreatePeriod:
         
         assert response.status_code == 201
 
+    def test_create_period_rolls_forward_templates_with_dependencies(
+        self, client: TestClient, db_session: Session, sample_user
+    ):
+        """Should create one task per active template and copy dependencies"""
+        prepare = TaskTemplateModel(name="Prepare", close_type=CloseType.MONTHLY, days_offset=2)
+        review = TaskTemplateModel(name="Review", close_type=CloseType.MONTHLY, default_owner_id=sample_user.id)
+        review.dependencies.append(prepare)
+        inactive = TaskTemplateModel(name="Retired", close_type=CloseType.MONTHLY, is_active=False)
+        db_session.add_all([prepare, review, inactive])
+        db_session.commit()
+
+        response = client.post(
+            "/api/periods/?roll_forward_tasks=true",
+            json={"name": "April 2024", "month": 4, "year": 2024, "close_type": "monthly"},
+        )
+
+        assert response.status_code == 201
+        db_session.expire_all()
+        tasks = {
+            task.name: task
+            for task in db_session.query(TaskModel).filter(TaskModel.period_id == response.json()["id"])
+        }
+        assert set(tasks) == {"Prepare", "Review"}
+        assert tasks["Review"].owner_id == sample_user.id
+        assert tasks["Prepare"].status == TaskStatus.NOT_STARTED
+        assert tasks["Prepare"].is_recurring is True
+        assert [dep.id for dep in tasks["Review"].dependencies] == [tasks["Prepare"].id]
+
     def test_create_period_invalid_month(self, client: TestClient):
         """Should return 422 for invalid month"""
         period_data = {
@@ -250,6 +374,14 @@ class TestUpdatePeriod:
         
         assert response.status_code == 404
 
+    def test_update_period_visible_to_cached_get(self, client: TestClient, sample_period: PeriodModel):
+        """Should not serve a cached copy of the period after an update"""
+        assert client.get(f"/api/periods/{sample_period.id}").json()["name"] == sample_period.name
+
+        client.put(f"/api/periods/{sample_period.id}", json={"name": "Renamed Period"})
+
+        assert client.get(f"/api/periods/{sample_period.id}").json()["name"] == "Renamed Period"
+
 
 class TestSetPeriodActivation:
     """Test suite for PATCH /api/periods/{period_id}/activation"""
@@ -276,6 +408,37 @@ class TestSetPeriodActivation:
         data = response.json()
         assert data["is_active"] is True
 
+    def test_activation_clears_cached_period_ids(
+        self, client: TestClient, db_session: Session, sample_period: PeriodModel, monkeypatch
+    ):
+        """Should drop cached active period ids so the change is seen at once"""
+        monkeypatch.setattr(
+            period_cache, "settings", dataclasses.replace(period_cache.settings, period_id_cache_ttl=60)
+        )
+        assert get_active_period_ids(db_session) == [sample_period.id]
+
+        response = client.patch(
+            f"/api/periods/{sample_period.id}/activation",
+            json={"is_active": False}
+        )
+
+        assert response.status_code == 200
+        assert get_active_period_ids(db_session) == []
+
+    def test_missing_period_is_not_cached(self, db_session: Session, monkeypatch):
+        """A period created after a miss should be found on the next lookup"""
+        monkeypatch.setattr(
+            period_cache, "settings", dataclasses.replace(period_cache.settings, period_id_cache_ttl=60)
+        )
+        assert get_period_snapshot(db_session, 4242) is None
+
+        db_session.add(PeriodModel(
+            id=4242, name="March 2026", month=3, year=2026, close_type=CloseType.MONTHLY
+        ))
+        db_session.commit()
+
+        assert get_period_snapshot(db_session, 4242).id == 4242
+
 
 class TestDeletePeriod:
     """Test suite for DELETE /api/periods/{period_id}"""
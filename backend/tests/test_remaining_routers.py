@@ -10,22 +10,32 @@ This file tests the remaining routers:
 - Task Templates
 """
 
+import asyncio
+import csv
+import io
 import pytest
+from datetime import datetime, timedelta, timezone
 from decimal import Decimal
 from fastapi.testclient import TestClient
-from sqlalchemy.orm import Session
+from sqlalchemy import event
+from sqlalchemy.orm import Session, sessionmaker
 
+from backend.routers import notifications as notifications_router
+from backend.routers import reports as reports_router
 from backend.models import (
     Task as TaskModel,
     Period as PeriodModel,
     User as UserModel,
     Approval as ApprovalModel,
     Comment as CommentModel,
+    File as FileModel,
+    AuditLog as AuditLogModel,
     Notification as NotificationModel,
     TaskTemplate as TaskTemplateModel,
     TrialBalance as TrialBalanceModel,
     TrialBalanceAccount as TrialBalanceAccountModel,
     TaskStatus,
+    ApprovalStatus,
     CloseType
 )
 
@@ -45,6 +55,35 @@ class TestApprovals:
         data = response.json()
         assert isinstance(data, list)
 
+    def test_get_task_approvals_includes_reviewer(self, client: TestClient, db_session: Session, sample_task: TaskModel, sample_user: UserModel):
+        """GET /api/approvals/task/{task_id} - Should embed reviewer details"""
+        db_session.add(ApprovalModel(task_id=sample_task.id, reviewer_id=sample_user.id))
+        db_session.commit()
+
+        response = client.get(f"/api/approvals/task/{sample_task.id}")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert len(data) == 1
+        assert data[0]["reviewer"]["id"] == sample_user.id
+        assert data[0]["reviewer"]["name"] == sample_user.name
+
+    def test_get_my_approvals(self, client: TestClient, db_session: Session, sample_task: TaskModel, sample_user: UserModel):
+        """GET /api/approvals/my-approvals - Should filter by status for the current reviewer"""
+        db_session.add_all([
+            ApprovalModel(task_id=sample_task.id, reviewer_id=sample_user.id),
+            ApprovalModel(task_id=sample_task.id, reviewer_id=sample_user.id, status="approved"),
+        ])
+        db_session.commit()
+
+        response = client.get("/api/approvals/my-approvals", params={"status": "pending"})
+
+        assert response.status_code == 200
+        data = response.json()
+        assert len(data) == 1
+        assert data[0]["status"] == "pending"
+        assert data[0]["reviewer"]["email"] == sample_user.email
+
     def test_create_approval(self, client: TestClient, sample_task: TaskModel, sample_user: UserModel):
         """POST /api/approvals/ - Should create a new approval request"""
         approval_data = {
@@ -83,6 +122,65 @@ class TestApprovals:
         assert response.status_code == 200
         data = response.json()
         assert data["status"] == "approved"
+        log = db_session.query(AuditLogModel).filter(AuditLogModel.action == "approval_updated").one()
+        assert (log.old_value, log.new_value) == ("pending", "approved")
+
+    def test_update_approval_by_other_reviewer_forbidden(self, client: TestClient, db_session: Session, sample_task: TaskModel, sample_admin: UserModel):
+        """PUT /api/approvals/{approval_id} - Should only let the assigned reviewer update"""
+        approval = ApprovalModel(task_id=sample_task.id, reviewer_id=sample_admin.id)
+        db_session.add(approval)
+        db_session.commit()
+
+        response = client.put(f"/api/approvals/{approval.id}", json={"status": "approved"})
+
+        assert response.status_code == 403
+        db_session.expire_all()
+        assert db_session.get(ApprovalModel, approval.id).status == ApprovalStatus.PENDING
+
+    def test_update_missing_approval(self, client: TestClient):
+        """PUT /api/approvals/{approval_id} - Should return 404 for unknown approvals"""
+        response = client.put("/api/approvals/99999", json={"status": "approved"})
+
+        assert response.status_code == 404
+
+    def test_delete_approval(self, client: TestClient, db_session: Session, sample_task: TaskModel, sample_user: UserModel):
+        """DELETE /api/approvals/{approval_id} - Should delete and log the approval"""
+        approval = ApprovalModel(task_id=sample_task.id, reviewer_id=sample_user.id)
+        db_session.add(approval)
+        db_session.commit()
+
+        response = client.delete(f"/api/approvals/{approval.id}")
+
+        assert response.status_code == 204
+        assert db_session.query(ApprovalModel).count() == 0
+        log = db_session.query(AuditLogModel).filter(AuditLogModel.action == "approval_deleted").one()
+        assert log.task_id == sample_task.id
+        assert log.entity_id == approval.id
+
+    def test_approval_changes_update_task_latest_status(self, client: TestClient, db_session: Session, sample_task: TaskModel, sample_user: UserModel):
+        """Approval create/update/delete should keep Task.latest_approval_status in sync"""
+        response = client.post("/api/approvals/", json={"task_id": sample_task.id, "reviewer_id": sample_user.id})
+        approval_id = response.json()["id"]
+        db_session.expire_all()
+        assert db_session.get(TaskModel, sample_task.id).latest_approval_status == ApprovalStatus.PENDING
+
+        client.put(f"/api/approvals/{approval_id}", json={"status": "approved"})
+        db_session.expire_all()
+        task = db_session.get(TaskModel, sample_task.id)
+        assert task.latest_approval_status == ApprovalStatus.APPROVED
+        assert task.latest_approval_at is not None
+
+        client.delete(f"/api/approvals/{approval_id}")
+        db_session.expire_all()
+        task = db_session.get(TaskModel, sample_task.id)
+        assert task.latest_approval_status is None
+        assert task.latest_approval_at is None
+
+    def test_delete_missing_approval(self, client: TestClient):
+        """DELETE /api/approvals/{approval_id} - Should return 404 for unknown approvals"""
+        response = client.delete("/api/approvals/99999")
+
+        assert response.status_code == 404
 
 
 # ============================================================================
@@ -100,6 +198,19 @@ class TestComments:
         data = response.json()
         assert isinstance(data, list)
 
+    def test_get_task_comments_includes_user(self, client: TestClient, db_session: Session, sample_task: TaskModel, sample_user: UserModel):
+        """GET /api/comments/task/{task_id} - Should embed the author's details"""
+        db_session.add(CommentModel(task_id=sample_task.id, user_id=sample_user.id, content="Tie-out attached"))
+        db_session.commit()
+
+        response = client.get(f"/api/comments/task/{sample_task.id}")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert len(data) == 1
+        assert data[0]["content"] == "Tie-out attached"
+        assert data[0]["user"]["name"] == sample_user.name
+
     def test_create_comment(self, client: TestClient, sample_task: TaskModel):
         """POST /api/comments/ - Should create a new comment"""
         comment_data = {
@@ -115,6 +226,24 @@ class TestComments:
         assert data["content"] == comment_data["content"]
         assert data["task_id"] == sample_task.id
 
+    def test_create_comment_reads_defaults_from_insert(
+        self, client: TestClient, db_session: Session, sample_task: TaskModel
+    ):
+        """POST /api/comments/ - Should not re-select the new comment's columns"""
+        statements = []
+        listener = lambda *args: statements.append(args[2])
+        event.listen(db_session.bind, "before_cursor_execute", listener)
+        try:
+            response = client.post(
+                "/api/comments/", json={"task_id": sample_task.id, "content": "Tied out"}
+            )
+        finally:
+            event.remove(db_session.bind, "before_cursor_execute", listener)
+
+        assert response.status_code == 201
+        assert response.json()["updated_at"] is None
+        assert not [sql for sql in statements if sql.startswith("SELECT comments.")]
+
     def test_update_comment(self, client: TestClient, db_session: Session, sample_task: TaskModel):
         """PUT /api/comments/{comment_id} - Should update comment"""
         # Create comment first
@@ -153,6 +282,23 @@ class TestComments:
         
         assert response.status_code == 204
 
+    def test_delete_comment_by_other_user_forbidden(self, client: TestClient, db_session: Session, sample_task: TaskModel, sample_admin: UserModel):
+        """DELETE /api/comments/{comment_id} - Should refuse to delete another user's comment"""
+        comment = CommentModel(task_id=sample_task.id, user_id=sample_admin.id, content="Not yours")
+        db_session.add(comment)
+        db_session.commit()
+
+        response = client.delete(f"/api/comments/{comment.id}")
+
+        assert response.status_code == 403
+        assert db_session.query(CommentModel).count() == 1
+
+    def test_delete_missing_comment(self, client: TestClient):
+        """DELETE /api/comments/{comment_id} - Should return 404 for unknown comments"""
+        response = client.delete("/api/comments/99999")
+
+        assert response.status_code == 404
+
 
 # ============================================================================
 # NOTIFICATIONS TESTS
@@ -189,12 +335,90 @@ class TestNotifications:
         data = response.json()
         assert data["is_read"] is True
 
+    def test_mark_notification_read_twice(self, client: TestClient, db_session: Session):
+        """Marking an already-read notification returns it unchanged"""
+        notification = NotificationModel(
+            user_id=1,
+            title="Test Notification",
+            message="Test message",
+            notification_type="info",
+            is_read=False
+        )
+        db_session.add(notification)
+        db_session.commit()
+
+        first = client.put(f"/api/notifications/{notification.id}/read")
+        second = client.put(f"/api/notifications/{notification.id}/read")
+
+        assert second.status_code == 200
+        assert second.json()["is_read"] is True
+        assert second.json()["read_at"] == first.json()["read_at"]
+
+    def test_mark_other_users_notification_read(self, client: TestClient, db_session: Session):
+        """Another user's notification is reported as not found"""
+        notification = NotificationModel(
+            user_id=2,
+            title="Test Notification",
+            message="Test message",
+            notification_type="info",
+            is_read=False
+        )
+        db_session.add(notification)
+        db_session.commit()
+
+        response = client.put(f"/api/notifications/{notification.id}/read")
+
+        assert response.status_code == 404
+        db_session.refresh(notification)
+        assert notification.is_read is False
+
     def test_mark_all_read(self, client: TestClient):
         """POST /api/notifications/mark-all-read - Should mark all as read"""
         response = client.post("/api/notifications/mark-all-read")
         
         assert response.status_code == 200
 
+    def test_mark_all_read_stamps_unread(self, client: TestClient, db_session: Session):
+        """Should mark only the user's unread notifications and stamp read_at"""
+        for user_id, is_read in ((1, False), (1, False), (1, True), (2, False)):
+            db_session.add(NotificationModel(
+                user_id=user_id,
+                title="Test Notification",
+                message="Test message",
+                notification_type="info",
+                is_read=is_read
+            ))
+        db_session.commit()
+
+        response = client.post("/api/notifications/mark-all-read")
+
+        assert response.json() == 2
+        db_session.expire_all()
+        stamped = db_session.query(NotificationModel).filter(NotificationModel.read_at.isnot(None)).all()
+        assert {n.user_id for n in stamped} == {1}
+        assert len(stamped) == 2
+
+    def test_mark_all_read_updates_loaded_notifications(self, db_session: Session, sample_user: UserModel):
+        """Should keep notifications already loaded in the session in step"""
+        notification = NotificationModel(
+            user_id=sample_user.id,
+            title="Test Notification",
+            message="Test message",
+            notification_type="info",
+            is_read=False
+        )
+        db_session.add(notification)
+        db_session.commit()
+        # Load the row as a request would before marking everything read
+        db_session.refresh(notification)
+        assert notification.read_at is None
+
+        updated = asyncio.run(notifications_router.mark_all_notifications_read(db_session, sample_user))
+
+        assert updated == 1
+        assert notification.is_read is True
+        assert notification.read_at is not None
+
 
 # ============================================================================
 # TASK TEMPLATES TESTS
@@ -304,6 +528,29 @@ class TestReports:
         data = response.json()
         assert isinstance(data, list)
 
+    def test_get_task_report_counts(
+        self, client: TestClient, db_session: Session, sample_task: TaskModel, sample_user: UserModel,
+        sample_admin: UserModel
+    ):
+        """Should report names and file/approval counts for each task"""
+        sample_task.assignee_id = sample_admin.id
+        db_session.add_all([
+            FileModel(task_id=sample_task.id, filename="a", original_filename="a.pdf", file_path="", file_size=1),
+            FileModel(task_id=sample_task.id, filename="b", original_filename="b.pdf", file_path="", file_size=1),
+            ApprovalModel(task_id=sample_task.id, reviewer_id=sample_user.id),
+        ])
+        db_session.commit()
+
+        response = client.get(f"/api/reports/tasks?period_id={sample_task.period_id}")
+
+        assert response.status_code == 200
+        [row] = response.json()
+        assert row["owner_name"] == sample_user.name
+        assert row["assignee_name"] == sample_admin.name
+        assert row["period_name"] == sample_task.period.name
+        assert row["file_count"] == 2
+        assert row["approval_count"] == 1
+
     def test_get_period_metrics(self, client: TestClient):
         """GET /api/reports/period-metrics - Should return period metrics"""
         response = client.get("/api/reports/period-metrics")
@@ -313,6 +560,148 @@ class TestReports:
         assert isinstance(data, list)
 
 
+    def test_get_period_metrics_aggregates_tasks(
+        self, client: TestClient, db_session: Session, sample_period: PeriodModel, sample_task: TaskModel
+    ):
+        """Should total tasks per period and average whole completion days"""
+        start = datetime(2025, 1, 1, 9, 0, tzinfo=timezone.utc)
+        db_session.add_all([
+            TaskModel(name="Two days", period_id=sample_period.id, owner_id=sample_task.owner_id,
+                      status=TaskStatus.COMPLETE, started_at=start, completed_at=start + timedelta(days=2, hours=5)),
+            TaskModel(name="Four days", period_id=sample_period.id, owner_id=sample_task.owner_id,
+                      status=TaskStatus.COMPLETE, started_at=start, completed_at=start + timedelta(days=4)),
+            TaskModel(name="Untimed", period_id=sample_period.id, owner_id=sample_task.owner_id,
+                      status=TaskStatus.COMPLETE),
+        ])
+        empty_period = PeriodModel(name="Empty", month=2, year=2020, close_type=CloseType.MONTHLY)
+        db_session.add(empty_period)
+        db_session.commit()
+
+        response = client.get("/api/reports/period-metrics")
+
+        assert response.status_code == 200
+        metrics = {m["period_id"]: m for m in response.json()}
+        assert metrics[sample_period.id]["total_tasks"] == 4
+        assert metrics[sample_period.id]["completed_tasks"] == 3
+        assert metrics[sample_period.id]["completion_rate"] == 75.0
+        assert metrics[sample_period.id]["avg_task_completion_days"] == 3.0
+        assert metrics[empty_period.id]["total_tasks"] == 0
+        assert metrics[empty_period.id]["avg_task_completion_days"] is None
+
+    def test_get_workload_report(
+        self, client: TestClient, db_session: Session, sample_task: TaskModel, sample_user: UserModel,
+        sample_admin: UserModel
+    ):
+        """Should total tasks and hours per assignee, busiest first"""
+        def assigned(user, status, hours):
+            return TaskModel(name="Work", period_id=sample_task.period_id, owner_id=sample_user.id,
+                             assignee_id=user.id, status=status, estimated_hours=hours)
+
+        db_session.add_all([
+            assigned(sample_admin, TaskStatus.COMPLETE, 2.5),
+            assigned(sample_admin, TaskStatus.IN_PROGRESS, None),
+            assigned(sample_user, TaskStatus.NOT_STARTED, 1.0),
+        ])
+        db_session.commit()
+
+        response = client.get(f"/api/reports/workload?period_id={sample_task.period_id}")
+
+        assert response.status_code == 200
+        admin, user = response.json()
+        assert admin["user_id"] == sample_admin.id
+        assert (admin["assigned_tasks"], admin["completed_tasks"], admin["in_progress_tasks"]) == (2, 1, 1)
+        assert admin["estimated_hours"] == 2.5
+        assert admin["actual_hours"] == 0.0
+        assert admin["completion_rate"] == 50.0
+        assert user["user_id"] == sample_user.id
+        assert user["assigned_tasks"] == 1
+
+    def test_get_distribution_report(
+        self, client: TestClient, db_session: Session, sample_task: TaskModel
+    ):
+        """Should count tasks, completions and overdue work per department"""
+        start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+        db_session.add_all([
+            TaskModel(name="Done", period_id=sample_task.period_id, owner_id=sample_task.owner_id,
+                      department="Accounting", status=TaskStatus.COMPLETE,
+                      started_at=start, completed_at=start + timedelta(days=3)),
+            TaskModel(name="Late", period_id=sample_task.period_id, owner_id=sample_task.owner_id,
+                      status=TaskStatus.IN_PROGRESS, due_date=datetime.now(timezone.utc) - timedelta(days=1)),
+        ])
+        db_session.commit()
+
+        response = client.get(f"/api/reports/distribution?period_id={sample_task.period_id}")
+
+        assert response.status_code == 200
+        assert response.json() == [
+            {"department": "Accounting", "total_tasks": 2, "completed_tasks": 1, "overdue_tasks": 0,
+             "avg_completion_days": 3.0},
+            {"department": "Unassigned", "total_tasks": 1, "completed_tasks": 0, "overdue_tasks": 1,
+             "avg_completion_days": None},
+        ]
+
+    def test_distribution_counts_blank_department_as_unassigned(
+        self, client: TestClient, db_session: Session, sample_task: TaskModel
+    ):
+        """Should group an empty-string department with missing ones under Unassigned"""
+        db_session.add_all([
+            TaskModel(name="Blank", period_id=sample_task.period_id, owner_id=sample_task.owner_id, department=""),
+            TaskModel(name="Missing", period_id=sample_task.period_id, owner_id=sample_task.owner_id),
+        ])
+        db_session.commit()
+
+        response = client.get(f"/api/reports/distribution?period_id={sample_task.period_id}")
+
+        departments = {row["department"]: row["total_tasks"] for row in response.json()}
+        assert departments["Unassigned"] == 2
+        assert "" not in departments
+
+    def test_distribution_completion_days_floor_like_timedelta(
+        self, client: TestClient, db_session: Session, sample_task: TaskModel
+    ):
+        """Should count completion days as timedelta.days does, flooring negatives"""
+        start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+        db_session.add_all([
+            TaskModel(name=name, period_id=sample_task.period_id, owner_id=sample_task.owner_id,
+                      department="Tax", status=TaskStatus.COMPLETE,
+                      started_at=start, completed_at=start + offset)
+            for name, offset in (("Quick", timedelta(days=2, hours=12)),
+                                 ("Backdated", timedelta(hours=-12)))
+        ])
+        db_session.commit()
+
+        response = client.get(f"/api/reports/distribution?period_id={sample_task.period_id}")
+
+        tax = next(row for row in response.json() if row["department"] == "Tax")
+        assert tax["avg_completion_days"] == (timedelta(days=2, hours=12).days + timedelta(hours=-12).days) / 2
+
+    def test_export_tasks_csv_streams_batches(
+        self, client: TestClient, db_session: Session, sample_task: TaskModel, sample_user: UserModel,
+        monkeypatch
+    ):
+        """Should stream every task as CSV, reading tasks in batches"""
+        monkeypatch.setattr(reports_router, "CSV_EXPORT_BATCH_SIZE", 2)
+        db_session.add_all([
+            TaskModel(name=f"Task {n}", period_id=sample_task.period_id, owner_id=sample_user.id)
+            for n in range(3)
+        ])
+        db_session.commit()
+
+        response = client.get(f"/api/reports/tasks/export/csv?period_id={sample_task.period_id}")
+        # Same test database the client's session factory points at
+        session_factory = sessionmaker(bind=db_session.bind)
+        chunks = list(reports_router._iter_tasks_csv(session_factory, sample_task.period_id))
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/csv")
+        # Header plus the first two rows, then the last two
+        assert len(chunks) == 2
+        assert "".join(chunks) == response.text
+        rows = list(csv.reader(io.StringIO(response.text)))
+        assert rows[0][0] == "Task ID"
+        assert [row[1] for row in rows[1:]] == ["Sample Task", "Task 0", "Task 1", "Task 2"]
+        assert rows[1][3] == sample_user.name
+
 # ============================================================================
 # TRIAL BALANCE TESTS
 # ============================================================================
@@ -395,3 +784,41 @@ class TestTrialBalance:
         assert template.department == "Accounting"
         assert template.estimated_hours == pytest.approx(0.25)
         assert template.default_account_numbers == ["1000"]
+
+    def test_get_missing_task_suggestions(
+        self,
+        client: TestClient,
+        db_session: Session,
+        sample_period: PeriodModel,
+        sample_user: UserModel,
+        sample_task: TaskModel,
+    ):
+        """GET /api/trial-balance/{id}/missing-tasks - Should suggest uncovered template/account pairs"""
+        template = TaskTemplateModel(
+            name="Reconcile",
+            close_type=CloseType.MONTHLY,
+            default_account_numbers=["1000", " 2000 ", "9999", "1000"],
+        )
+        trial_balance = TrialBalanceModel(
+            period_id=sample_period.id,
+            name="January TB",
+            source_filename="tb.csv",
+            stored_filename="tb.csv",
+            file_path="/tmp/tb.csv",
+        )
+        db_session.add_all([template, trial_balance])
+        db_session.flush()
+        cash = TrialBalanceAccountModel(trial_balance_id=trial_balance.id, account_number="1000", account_name="Cash")
+        receivables = TrialBalanceAccountModel(trial_balance_id=trial_balance.id, account_number="2000", account_name="AR")
+        db_session.add_all([cash, receivables])
+        sample_task.template_id = template.id
+        cash.tasks.append(sample_task)
+        db_session.commit()
+
+        assert sorted(link.account_number for link in template.account_links) == ["1000", "2000", "9999"]
+
+        response = client.get(f"/api/trial-balance/{trial_balance.id}/missing-tasks")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert [(item["template_id"], item["account_number"]) for item in data] == [(template.id, "2000")]
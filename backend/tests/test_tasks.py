@@ -18,7 +18,7 @@ import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy.orm import Session
 
-from backend.models import Task as TaskModel, Period as PeriodModel, User as UserModel
+from backend.models import Task as TaskModel, Period as PeriodModel, User as UserModel, AuditLog as AuditLogModel
 
 
 class TestGetTasks:
@@ -302,6 +302,22 @@ class TestUpdateTask:
         data = response.json()
         assert data["status"] == "complete"
 
+    def test_update_task_null_status(self, client: TestClient, db_session: Session, sample_task: TaskModel):
+        """Should leave the status unchanged and log nothing for an explicit null"""
+        response = client.put(
+            f"/api/tasks/{sample_task.id}",
+            json={"name": "Renamed", "status": None}
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["name"] == "Renamed"
+        assert data["status"] == sample_task.status.value
+        assert db_session.query(AuditLogModel).filter(
+            AuditLogModel.task_id == sample_task.id,
+            AuditLogModel.action == "status_changed"
+        ).count() == 0
+
     def test_update_task_not_found(self, client: TestClient):
         """Should return 404 when updating non-existent task"""
         response = client.put("/api/tasks/99999", json={"name": "Test"})
@@ -1,6 +1,10 @@
+from dataclasses import replace
 from decimal import Decimal
 from pathlib import Path
 
+import pytest
+
+from backend.routers import trial_balance as trial_balance_router
 from backend.models import (
     User,
     Period,
@@ -13,6 +17,16 @@ from backend.models import (
 )
 
 
+@pytest.fixture(autouse=True)
+def storage(tmp_path, monkeypatch):
+    """Store imported trial balance files under tmp_path."""
+    monkeypatch.setattr(
+        trial_balance_router, "settings",
+        replace(trial_balance_router.settings, file_storage_path=str(tmp_path))
+    )
+    return tmp_path
+
+
 def seed_period_and_user(session):
     user = User(
         id=1,
@@ -78,7 +92,7 @@ def test_import_netsuite_trial_balance(client, db_session):
     assert period_files[0].original_filename == "TrialBalance677.csv"
 
 
-def test_import_trial_balance_creates_period_file(client, db_session):
+def test_import_trial_balance_creates_period_file(client, db_session, storage):
     seed_period_and_user(db_session)
 
     csv_content = (
@@ -100,6 +114,7 @@ def test_import_trial_balance_creates_period_file(client, db_session):
     )
     assert len(period_files) == 1
     assert period_files[0].original_filename == "simple_tb.csv"
+    assert len(list((storage / "trial_balances").rglob("*.csv"))) == 1
 
 
 def test_import_netsuite_validation_on_empty_file(client, db_session):